@@ -4,6 +4,8 @@ Quest 9: Sparkling Bugs
 https://everybody.codes/event/2024/quests/9
 """
 from pathlib import Path
+import numpy as np
+
 
 def read_sparkballs_data(filepath: str) -> list[int]:
     """Read and parse the list of brightness values from a part's input file."""
@@ -30,30 +32,66 @@ def part1(filepath: str = "../input/everybody_codes_e2024_q09_p1.txt") -> None:
     print("Part 1:", total)
 
 
-def part2(filepath: str = "../input/everybody_codes_e2024_q09_p2.txt") -> None:
-    sparkballs = read_sparkballs_data(filepath)
-    # Available dot stamps
-    stamps = [30, 25, 24, 20, 16, 15, 10, 5, 3, 1]
+# Tables of minimum beetle counts, keyed by the (sorted) stamp set
+_beetle_tables: dict[tuple[int, ...], np.ndarray] = {}
+
 
-    # Memoization dictionary
-    dp = {}
+def min_beetles_table(stamps: list[int], limit: int) -> np.ndarray:
+    """
+    Return an array whose entry x is the fewest beetles needed to reach brightness x.
 
-    def find_min(total: int) -> int:
-        if total == 0:
-            return 0
-        if total < 0:
-            return float("inf")
-        if total in dp:
-            return dp[total]
+    Unbounded coin change, one vectorised pass per stamp: viewing the table as
+    rows of `stamp` columns, repeatedly using the stamp walks down a column, so
+    dp[k] = min_j<=k(dp[j] + k - j) is a cumulative minimum of dp[j] - j.
+    Tables are cached per stamp set and only rebuilt when a larger one is needed.
+    """
+    key = tuple(sorted(set(stamps)))
+    table = _beetle_tables.get(key)
+    if table is not None and len(table) > limit:
+        return table
+
+    # Unreachable values keep a large sentinel instead of float("inf")
+    unreachable = np.iinfo(np.int64).max // 2
+    dp = np.full(limit + 1, unreachable, dtype=np.int64)
+    dp[0] = 0
+    for stamp in key:
+        rows = -(-(limit + 1) // stamp)
+        padded = np.full(rows * stamp, unreachable, dtype=np.int64)
+        padded[:limit + 1] = dp
+        grid = padded.reshape(rows, stamp)
+        steps = np.arange(rows, dtype=np.int64)[:, None]
+        grid = np.minimum.accumulate(grid - steps, axis=0) + steps
+        dp = np.minimum(dp, grid.ravel()[:limit + 1])
+
+    _beetle_tables[key] = dp
+    return dp
+
+
+def min_split_beetles(sparkballs: list[int], stamps: list[int], max_split: int = 100) -> np.ndarray:
+    """
+    Return the fewest beetles for each sparkball split into two halves
+    whose brightness differs by no more than `max_split`.
+    """
+    values = np.asarray(sparkballs, dtype=np.int64)
+    dp = min_beetles_table(stamps, int(values.max()))
+    lower = values // 2
+    higher = values - lower
+    # Shift both halves apart by 0..max_split//2 and take the windowed minimum
+    shifts = np.arange(max_split // 2 + 1, dtype=np.int64)
+    left = lower[:, None] + shifts
+    right = higher[:, None] - shifts
+    valid = right >= 0
+    costs = dp[np.where(valid, left, 0)] + dp[np.where(valid, right, 0)]
+    return np.where(valid, costs, np.iinfo(np.int64).max).min(axis=1)
 
-        min_beetle_count = float("inf")
-        for stamp in stamps:
-            min_beetle_count = min(min_beetle_count, 1 + find_min(total - stamp))
 
-        dp[total] = min_beetle_count
-        return min_beetle_count
+def part2(filepath: str = "../input/everybody_codes_e2024_q09_p2.txt") -> None:
+    sparkballs = read_sparkballs_data(filepath)
+    # Available dot stamps
+    stamps = [30, 25, 24, 20, 16, 15, 10, 5, 3, 1]
 
-    total = sum(find_min(sb) for sb in sparkballs)
+    dp = min_beetles_table(stamps, max(sparkballs))
+    total = int(dp[sparkballs].sum())
 
     print("Part 2:", total)
 
@@ -62,26 +100,8 @@ def part3(filepath: str = "../input/everybody_codes_e2024_q09_p3.txt") -> None:
     sparkballs = read_sparkballs_data(filepath)
     # Available dot stamps
     stamps = [1, 3, 5, 10, 15, 16, 20, 24, 25, 30, 37, 38, 49, 50, 74, 75, 100, 101]
-    
-    # iterative dp approach, precompute all possible sparkballs
-    total = 0
-    max_sparkball = max(sparkballs)
-    dp = [float('inf')] * (max_sparkball + 1)
-    dp[0] = 0
-    for x in range(1, max_sparkball+1):
-        for stamp in stamps:
-            if x >= stamp:
-                dp[x] = min(dp[x], dp[x - stamp] + 1)
-    
-    for sparkball in sparkballs:
-        min_sparkball = float("inf")
-        lower = sparkball // 2
-        higher = sparkball // 2
-        if sparkball % 2 == 1:
-            higher += 1
-        for split_spark in range(0, 51):
-            min_sparkball = min(min_sparkball, dp[lower + split_spark] + dp[higher - split_spark])
-        total += min_sparkball
+
+    total = int(min_split_beetles(sparkballs, stamps).sum())
 
     print("Part 3:", total)
 
@@ -3,8 +3,10 @@ The Kingdom of Algorithmia [2024]
 Quest 10: Shrine Needs to Shine
 https://everybody.codes/event/2024/quests/10
 """
-from collections import Counter
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
         
 def part1(filepath: str = "../input/everybody_codes_e2024_q10_p1.txt") -> None:
@@ -18,99 +20,237 @@ def part1(filepath: str = "../input/everybody_codes_e2024_q10_p1.txt") -> None:
     print("Part 1:", runic_word)
 
 
-def part2(filepath: str = "../input/everybody_codes_e2024_q10_p2.txt") -> None:
-    lines = Path(filepath).read_text().strip().splitlines()
+TILE_SIZE = 8
+# Tiles are separated by one blank column and one blank line
+TILE_STRIDE = TILE_SIZE + 1
+BORDER = (0, 1, TILE_SIZE - 2, TILE_SIZE - 1)
+CENTER = range(2, TILE_SIZE - 2)
+
+# Wall buffer shared with worker processes, with its line and tile-row strides
+_wall: bytes = b""
+_line_stride = 0
+_row_stride = 0
+
+
+def decode_tile(wall: bytes, origin: int, line_stride: int) -> str:
+    """
+    Decode the runic word of the tile whose top-left byte is at `origin`.
+
+    Each centre letter is the one rune shared by its row's and column's borders.
+    A '.' is written where no rune is shared.
+    """
+    word = bytearray()
+    for r in CENTER:
+        row = origin + r * line_stride
+        row_runes = {wall[row + c] for c in BORDER}
+        for c in CENTER:
+            col = origin + c
+            word.append(next((wall[col + y * line_stride] for y in BORDER
+                              if wall[col + y * line_stride] in row_runes), ord(".")))
+    return word.decode()
+
+
+def decode_tile_row(tile_row: int) -> list[str]:
+    """Decode every tile in one row of tiles of the shared wall buffer."""
+    num_tiles = _line_stride // TILE_STRIDE
+    top = tile_row * _row_stride
+    return [decode_tile(_wall, top + t * TILE_STRIDE, _line_stride) for t in range(num_tiles)]
+
+
+def tile_row_stride(wall: bytes, line_stride: int) -> int:
+    """Return the byte distance between rows of tiles: eight lines plus the separator line."""
+    separator = TILE_SIZE * line_stride
+    if separator >= len(wall):
+        return len(wall) + 1
+    return wall.index(b"\n", separator) + 1
+
+
+def load_wall(wall: bytes, strides: tuple[int, int] | None = None) -> tuple[int, int]:
+    """
+    Install the wall buffer for `decode_tile_row` (also a worker initializer).
+
+    The line and tile-row strides are computed unless already given, and returned.
+    """
+    global _wall, _line_stride, _row_stride
+    if strides is None:
+        line_stride = wall.index(b"\n") + 1
+        strides = line_stride, tile_row_stride(wall, line_stride)
+    _wall = wall
+    _line_stride, _row_stride = strides
+    return strides
 
-    big_rows = [lines[i:i+8] for i in range(0, len(lines), 9)]
-    big_row = list(map(" ".join, zip(*big_rows)))
-    big_row = [l.split() for l in big_row]
 
-    grids = list(zip(*big_row))
-    words = []
+def decode_wall(filepath: str, workers: int = 1) -> Iterator[str]:
+    """
+    Stream the runic words of a tiled wall, walking the tile layout with
+    stride arithmetic over the raw bytes. With `workers` > 1 rows of tiles
+    are decoded in a process pool.
+    """
+    wall = Path(filepath).read_bytes().replace(b"\r\n", b"\n").strip() + b"\n"
+    strides = load_wall(wall)
+    num_tile_rows = -(-len(wall) // strides[1])
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=load_wall, initargs=(wall, strides)) as pool:
+            for words in pool.map(decode_tile_row, range(num_tile_rows), chunksize=64):
+                yield from words
+    else:
+        for tile_row in range(num_tile_rows):
+            yield from decode_tile_row(tile_row)
+
 
-    for grid in grids:
-        rows = [set(line)-{"."} for line in grid[2:6]]
-        cols = [set(line)-{"."} for line in list(zip(*grid))[2:6]]
-        word = ""
-        for row in rows:
-            for col in cols:
-                word += (row&col).pop()
-        words.append(word)
+def part2(filepath: str = "../input/everybody_codes_e2024_q10_p2.txt", workers: int = 1) -> None:
 
     def score(word):
         if "." in word:
             return 0
         return sum(i*(ord(c)-64) for i,c in enumerate(word,1))
 
-    print("Part 2:", sum(map(score, words)))
+    print("Part 2:", sum(map(score, decode_wall(filepath, workers))))
 
 
-def process_block(grid: list[list[str]], start_row: int, start_col: int, R=8, C=8) -> bool:
-    """
-    Process a single 8x8 block in the grid.
-    Returns True if any changes were made.
-    """
-    changed = False
-    block = [[grid[start_row + r][start_col + c] for c in range(C)] for r in range(R)]
-
-    # Pass 1: Fill cells that can be deduced directly
-    for r in range(R):
-        for c in range(C):
-            if block[r][c] == '.':
-                row_vals = {block[r][cc] for cc in range(C)}
-                col_vals = {block[rr][c] for rr in range(R)}
-                candidates = (row_vals & col_vals) - {'.', '?'}
-
-                if len(candidates) == 1:
-                    grid[start_row + r][start_col + c] = candidates.pop()
-                    changed = True
-
-    # Pass 2: Handle '?' with deduction rules
-    for r in range(R):
-        for c in range(C):
-            if block[r][c] != '?':
-                continue
+def letter_bit(ch: str) -> int:
+    """Return the 26-bit mask bit for a rune letter, or 0 for any other symbol."""
+    return 1 << (ord(ch) - 65) if "A" <= ch <= "Z" else 0
+
 
-            row_vals = {block[r][cc] for cc in range(C)}
-            col_vals = {block[rr][c] for rr in range(R)}
+def single_letter(mask: int) -> str | None:
+    """Return the letter if exactly one bit is set in `mask`, otherwise None."""
+    if mask and mask & (mask - 1) == 0:
+        return chr(mask.bit_length() + 64)
+    return None
 
-            # Check missing single '.' in row
-            if '*' not in row_vals:
-                empty_cols = [cc for cc in range(C) if block[r][cc] == '.']
-                if len(empty_cols) == 1:
-                    col_freq = Counter(block[rr][empty_cols[0]] for rr in range(R))
-                    options = [k for k, v in col_freq.items() if v == 1 and k != '.']
-                    if len(options) == 1:
-                        grid[start_row + r][start_col + c] = options[0]
-                        changed = True
 
-            # Check missing single '.' in column
-            if '*' not in col_vals:
-                empty_rows = [rr for rr in range(R) if block[rr][c] == '.']
-                if len(empty_rows) == 1:
-                    row_freq = Counter(block[empty_rows[0]][cc] for cc in range(C))
-                    options = [k for k, v in row_freq.items() if v == 1 and k != '.']
-                    if len(options) == 1:
-                        grid[start_row + r][start_col + c] = options[0]
-                        changed = True
+class RunicWall:
+    """
+    Propagation state for a wall of overlapping 8x8 blocks.
+
+    Every row and column of every block (a "line") keeps a mask of the letters
+    present, a mask of letters present more than once, and counts of the
+    '.', '?' and '*' symbols it holds. Filling a cell updates the lines of
+    each block containing that cell and queues those blocks for another look.
+    """
 
-    return changed
+    def __init__(self, grid: list[list[str]], R=8, C=8) -> None:
+        self.grid = grid
+        self.R, self.C = R, C
+        self.block_rows = max(0, (len(grid) - R) // (R - 2) + 1)
+        self.block_cols = max(0, (len(grid[0]) - C) // (C - 2) + 1) if grid else 0
+        num_lines = self.block_rows * self.block_cols * (R + C)
+        self.present = [0] * num_lines
+        self.repeated = [0] * num_lines
+        self.symbols = {sym: [0] * num_lines for sym in ".?*"}
+
+        for block in range(self.block_rows * self.block_cols):
+            top, left = self.block_origin(block)
+            for r in range(R):
+                for c in range(C):
+                    ch = grid[top + r][left + c]
+                    for line in (self.row_line(block, r), self.col_line(block, c)):
+                        self.add_symbol(line, ch)
+
+    def block_origin(self, block: int) -> tuple[int, int]:
+        """Return the top-left grid position of a block."""
+        i, j = divmod(block, self.block_cols)
+        return i * (self.R - 2), j * (self.C - 2)
+
+    def row_line(self, block: int, r: int) -> int:
+        """Return the line index of row `r` of a block."""
+        return block * (self.R + self.C) + r
+
+    def col_line(self, block: int, c: int) -> int:
+        """Return the line index of column `c` of a block."""
+        return block * (self.R + self.C) + self.R + c
+
+    def add_symbol(self, line: int, ch: str) -> None:
+        """Record symbol `ch` as held by `line`."""
+        bit = letter_bit(ch)
+        if bit:
+            if self.present[line] & bit:
+                self.repeated[line] |= bit
+            self.present[line] |= bit
+        elif ch in self.symbols:
+            self.symbols[ch][line] += 1
+
+    def blocks_containing(self, y: int, x: int) -> list[tuple[int, int, int]]:
+        """Return (block, r, c) for every block covering grid cell (y, x)."""
+        blocks = []
+        step_r, step_c = self.R - 2, self.C - 2
+        for i in {y // step_r, y // step_r - 1}:
+            r = y - i * step_r
+            if not (0 <= i < self.block_rows and 0 <= r < self.R):
+                continue
+            for j in {x // step_c, x // step_c - 1}:
+                c = x - j * step_c
+                if 0 <= j < self.block_cols and 0 <= c < self.C:
+                    blocks.append((i * self.block_cols + j, r, c))
+        return blocks
+
+    def fill(self, y: int, x: int, letter: str, queue: deque, queued: list[bool]) -> None:
+        """Place `letter` at (y, x), update the affected lines and queue their blocks."""
+        old = self.grid[y][x]
+        self.grid[y][x] = letter
+        for block, r, c in self.blocks_containing(y, x):
+            for line in (self.row_line(block, r), self.col_line(block, c)):
+                self.symbols[old][line] -= 1
+                self.add_symbol(line, letter)
+            if not queued[block]:
+                queued[block] = True
+                queue.append(block)
+
+    def unique_option(self, line: int) -> str | None:
+        """
+        Return the only symbol appearing exactly once in `line` (ignoring '.'),
+        if that symbol is a letter.
+        """
+        once = self.present[line] & ~self.repeated[line]
+        if self.symbols["?"][line] == 1 or self.symbols["*"][line] == 1:
+            return None
+        return single_letter(once)
+
+    def process_block(self, block: int, queue: deque, queued: list[bool]) -> None:
+        """Deduce every cell of a block that can be filled from its current masks."""
+        top, left = self.block_origin(block)
+        R, C = self.R, self.C
+        grid = self.grid
+        for r in range(R):
+            row = self.row_line(block, r)
+            if not (self.symbols["."][row] or self.symbols["?"][row]):
+                continue
+            for c in range(C):
+                ch = grid[top + r][left + c]
+                col = self.col_line(block, c)
+                if ch == ".":
+                    # Fill cells that can be deduced directly
+                    letter = single_letter(self.present[row] & self.present[col])
+                    if letter:
+                        self.fill(top + r, left + c, letter, queue, queued)
+                elif ch == "?":
+                    # A single '.' left in the row (or column) pins down the '?'
+                    letter = None
+                    if not self.symbols["*"][row] and self.symbols["."][row] == 1:
+                        empty_col = next(cc for cc in range(C) if grid[top + r][left + cc] == ".")
+                        letter = self.unique_option(self.col_line(block, empty_col))
+                    if not letter and not self.symbols["*"][col] and self.symbols["."][col] == 1:
+                        empty_row = next(rr for rr in range(R) if grid[top + rr][left + c] == ".")
+                        letter = self.unique_option(self.row_line(block, empty_row))
+                    if letter:
+                        self.fill(top + r, left + c, letter, queue, queued)
 
 
 def solve_grid(grid: list[list[str]], block_height=8, block_width=8) -> list[list[str]]:
-    """Iteratively solve all 8x8 blocks in the grid until no changes occur."""
-    while True:
-        changed = False
-        for br in range(0, len(grid), 6):
-            if br + block_height - 1 >= len(grid):
-                continue
-            for bc in range(0, len(grid[br]), 6):
-                if bc + block_width - 1 >= len(grid[br]):
-                    continue
-                if process_block(grid, br, bc, block_height, block_width):
-                    changed = True
-        if not changed:
-            break
+    """
+    Solve all 8x8 blocks in the grid with a worklist:
+    only blocks touched by the last fill are examined again.
+    """
+    wall = RunicWall(grid, block_height, block_width)
+    num_blocks = wall.block_rows * wall.block_cols
+    queue = deque(range(num_blocks))
+    queued = [True] * num_blocks
+    while queue:
+        block = queue.popleft()
+        queued[block] = False
+        wall.process_block(block, queue, queued)
 
     return grid
 
@@ -3,8 +3,9 @@ The Kingdom of Algorithmia [2024]
 Quest 11: Biological Warfare
 https://everybody.codes/event/2024/quests/11
 """
-from collections import Counter
 from pathlib import Path
+import numpy as np
+
 
 def load_conversion_rules(filepath: str) -> dict[str, list[str]]:
     """
@@ -30,22 +31,47 @@ def load_conversion_rules(filepath: str) -> dict[str, list[str]]:
     return rules
 
 
-def next_generation_counter(children: list[str], count: int) -> Counter:
+def transition_matrix(rules: dict[str, list[str]]) -> tuple[list[str], np.ndarray]:
     """
-    Generate a Counter of the next generation based on offspring rules.
-
-    Args:
-        children: List of termite categories produced by a parent.
-        count: Number of parent termites of this type.
+    Compile the conversion rules into an integer transition matrix.
 
     Returns:
-        A Counter mapping each child category to its resulting termite count.
-        (Each child gets 'count' added to its total.)
+        The list of categories and a square object-dtype matrix where
+        entry [i, j] is how many category j termites one category i
+        termite turns into overnight.
+    """
+    categories = list(dict.fromkeys([*rules, *(c for cs in rules.values() for c in cs)]))
+    index = {category: i for i, category in enumerate(categories)}
+    matrix = np.zeros((len(categories), len(categories)), dtype=object)
+    for parent, children in rules.items():
+        for child in children:
+            matrix[index[parent], index[child]] += 1
+    return categories, matrix
+
+
+def population_totals(num_days: int, rules: dict[str, list[str]]) -> dict[str, int]:
+    """
+    Compute the population after 'num_days' generations for every starting category.
+
+    Row i of M^days holds the counts descended from one category i termite,
+    so M^days applied to a vector of ones gives every total at once. The power
+    is taken by repeated squaring, in int64 when no count can exceed it and
+    with exact Python integers otherwise.
     """
-    next_generation = Counter()
-    for termite_category in children:
-        next_generation[termite_category] += count
-    return next_generation
+    categories, matrix = transition_matrix(rules)
+    # No count after d days exceeds (largest brood)^d
+    largest_brood = max(map(len, rules.values()), default=0)
+    if largest_brood <= 1 or num_days * largest_brood.bit_length() < 63:
+        matrix = matrix.astype(np.int64)
+    totals = np.ones(len(categories), dtype=matrix.dtype)
+    power = matrix
+    while num_days:
+        if num_days & 1:
+            totals = power.dot(totals)
+        num_days >>= 1
+        if num_days:
+            power = power.dot(power)
+    return dict(zip(categories, map(int, totals)))
 
 
 def track_population(category: str, num_days: int, rules: dict[str, list[str]]) -> int:
@@ -64,18 +90,7 @@ def track_population(category: str, num_days: int, rules: dict[str, list[str]])
     Returns:
         The total population count after 'num_days' generations.
     """
-    # Start with one termite of the given category
-    counts = Counter([category])
-
-    # Simulate day-by-day population growth
-    for _ in range(num_days):
-        new_counts = Counter()
-        for termite, count in counts.items():
-            new_counts += next_generation_counter(rules[termite], count)
-        counts = new_counts  # Move to next generation
-
-    # Return the total termite count after all generations
-    return sum(counts.values())
+    return population_totals(num_days, rules)[category]
 
 
 def part1(filepath: str = "../input/everybody_codes_e2024_q11_p1.txt") -> None:
@@ -99,14 +114,9 @@ def part2(filepath: str = "../input/everybody_codes_e2024_q11_p2.txt") -> None:
 def part3(filepath: str = "../input/everybody_codes_e2024_q11_p3.txt") -> None:
     """Calculate the population difference on the 20th day."""
     rules = load_conversion_rules(filepath)
-    largest, smallest = 0, float("inf")
-
-    for initial_termite in rules:
-        count = track_population(initial_termite, 20, rules)
-        if count < smallest:
-            smallest = count
-        if largest < count:
-            largest = count
+    totals = population_totals(20, rules)
+    counts = [totals[initial_termite] for initial_termite in rules]
+    largest, smallest = max(counts), min(counts)
 
     print("Part 3:", largest-smallest)
 
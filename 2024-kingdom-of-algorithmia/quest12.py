@@ -5,6 +5,7 @@ https://everybody.codes/event/2024/quests/12
 """
 from math import inf
 from pathlib import Path
+import numpy as np
 
 def load_lines(filepath: str) -> list[str]:
     """Read all non-empty lines from file."""
@@ -90,7 +91,49 @@ def get_projectile_height_power(source: tuple[int, int], target: tuple[int, int]
     return (-1, inf)
 
 
-def part3(filepath: str = "../input/everybody_codes_e2024_q12_p3.txt") -> None:
+def best_shots(meteors: np.ndarray, catapults: list[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched version of `get_projectile_height_power` over every meteor.
+
+    Evaluates the ascending, flat and descending trajectory conditions for
+    every (meteor, catapult, delay) combination as array operations, keeps
+    the first delay that works for each catapult and picks the catapult with
+    the highest hit, then the lowest power.
+
+    Returns (height, power) arrays; unreachable meteors get height -1 and
+    power -1.
+    """
+    x = meteors[:, 0, None, None]
+    y = meteors[:, 1, None, None]
+    source_x = np.array([cx for cx, _ in catapults])[None, :, None]
+    source_y = np.array([cy for _, cy in catapults])[None, :, None]
+    delay = np.arange(10)[None, None, :]
+
+    dx = x - delay - source_x
+    dy = y - delay - source_y
+    even = dx % 2 == 0
+    # Ascending, flat and descending trajectories, tested in that order
+    ascending = (dx == dy) & even
+    flat_p = dy - dx // 2
+    flat = even & (0 < dx - dy) & (dx - dy <= flat_p)
+    descending = even & (dy % 3 == 0) & (3 * (dx // 2) > 2 * dy)
+    p = np.select([ascending, flat, descending], [dx // 2, flat_p, dy // 3], 0)
+    hit = ascending | flat | descending
+
+    # First delay that reaches the meteor, per catapult
+    first = hit.argmax(axis=2)[..., None]
+    reachable = np.take_along_axis(hit, first, axis=2)[..., 0]
+    p = np.take_along_axis(p, first, axis=2)[..., 0]
+    heights = np.where(reachable, p + source_y[..., 0], -1)
+    powers = np.where(reachable, p * (1 + source_y[..., 0]), -1)
+
+    # Highest height, or lowest power in event of a tie
+    order = np.lexsort((powers, -heights), axis=1)[:, :1]
+    return (np.take_along_axis(heights, order, axis=1)[:, 0],
+            np.take_along_axis(powers, order, axis=1)[:, 0])
+
+
+def part3(filepath: str = "../input/everybody_codes_e2024_q12_p3.txt", chunk_size: int = 1_000_000) -> None:
     """
     Part 3
     Calculate the lowest possible energy for the shots required to
@@ -102,18 +145,20 @@ def part3(filepath: str = "../input/everybody_codes_e2024_q12_p3.txt") -> None:
     Compute the height and energy needed.
     Pick the catapult that gives the highest trajectory using the least energy.
     Sum up the energy totals for the final result.
+    All meteors are evaluated at once as NumPy arrays, `chunk_size` at a time.
     """
-    lines = load_lines(filepath)
-    meteors = [tuple(map(int, line.split())) for line in lines]
+    text = Path(filepath).read_text()
+    meteors = np.array(text.split(), dtype=np.int64).reshape(-1, 2)
     catapults = [(0, 0), (0, 1), (0, 2)]
 
     total_energy = 0
-    # For each meteor, compute the result for all catapults.
-    for meteor in meteors:
-        results = [get_projectile_height_power(catapult, meteor) for catapult in catapults]
-        # Choose highest height, or lowest energy in event of a tie
-        best = max(results, key=lambda x: (x[0], -x[1]))
-        total_energy += best[1]
+    for start in range(0, len(meteors), chunk_size):
+        heights, powers = best_shots(meteors[start:start + chunk_size], catapults)
+        if (heights < 0).any():
+            # Some meteor is unreachable from every catapult
+            total_energy = inf
+            break
+        total_energy += int(powers.sum())
 
     print("Part 3:", total_energy)
 
@@ -3,37 +3,42 @@ The Kingdom of Algorithmia [2024]
 Quest 13: Never Gonna Let You Down
 https://everybody.codes/event/2024/quests/13
 """
+from array import array
 from math import inf
 from pathlib import Path
 
 
-def load_notes(filepath: str) -> dict[tuple[int, int], str]:
-    """
-    Load the maze grid from a file.
+WALL = -1
 
-    Each non-wall character (not '#' or ' ') becomes an entry in the grid,
-    mapped from its (row, column) coordinates to its character.
-    """
-    lines = Path(filepath).read_text().strip().splitlines()
-    grid = {}
 
-    for i, line in enumerate(lines):
-        for j, char in enumerate(line):
-            if char not in "# ":
-                grid[(i, j)] = char
-
-    return grid
+def load_notes(filepath: str) -> tuple[array, int, list[int], int]:
+    """
+    Load the maze grid from a file into a flat array of platform heights.
 
+    The grid is padded with a border of walls so every cell has four
+    neighbours at fixed offsets. Walls ('#' or ' ') are stored as -1 and
+    the start ('S') / end ('E') points at height 0.
 
-def adjacent_squares(position: tuple[int, int]) -> list[tuple[int, int]]:
-    """Return the 4 orthogonal neighboring squares (up, left, right, down)."""
-    i, j = position
-    return [(i - 1, j), (i, j - 1), (i, j + 1), (i + 1, j)]
+    Returns:
+        The heights, the padded row width, the start indices and the end index.
+    """
+    lines = Path(filepath).read_text().strip().splitlines()
+    width = max(map(len, lines)) + 2
+    heights = array("b", [WALL]) * (width * (len(lines) + 2))
+    starts, end = [], None
 
+    for i, line in enumerate(lines, 1):
+        for j, char in enumerate(line, 1):
+            if char in "# ":
+                continue
+            index = i * width + j
+            heights[index] = int(char) if char.isnumeric() else 0
+            if char == "S":
+                starts.append(index)
+            elif char == "E":
+                end = index
 
-def valid_adjacent_squares(position: tuple[int, int], maze: dict) -> list[tuple[int, int]]:
-    """Return neighbors that actually exist in the maze."""
-    return [p for p in adjacent_squares(position) if p in maze]
+    return heights, width, starts, end
 
 
 def min_transition(a: int, b: int) -> int:
@@ -51,45 +56,50 @@ def complete_maze(filepath: str) -> int:
     The maze consists of numeric tiles (0-9) and start ('S') / end ('E') points.
     Moving between adjacent spaces takes:
         1 + min_transition(current_value, neighbor_value) seconds.
-    """
-    maze = load_notes(filepath)
-
-    # Identify start and end points
-    starts = [pos for pos, char in maze.items() if char == 'S']
-    end, = (pos for pos, char in maze.items() if char == 'E')
 
-    # Convert characters to numeric values (non-numeric = 0)
-    maze = {pos: int(char) if char.isnumeric() else 0 for pos, char in maze.items()}
-
-    # Initialize cost table
-    costs = {pos: inf for pos in maze}
-    costs[end] = 0
-
-    # Start propagation from the end point backward
-    to_visit = set(valid_adjacent_squares(end, maze))
-
-    while to_visit:
-        next_visit = set()
-
-        for position in to_visit:
-            neighbors = valid_adjacent_squares(position, maze)
-            possible_costs = [
-                costs[nbr] + min_transition(maze[position], maze[nbr]) + 1
-                for nbr in neighbors
-            ]
-
-            if not possible_costs:
+    Edge weights are 1..6, so Dial's bucket-queue Dijkstra is used: a ring of
+    7 buckets indexed by cost. Every start point is seeded at cost 0, acting
+    as a single virtual source, and the search stops once the end is settled.
+    """
+    heights, width, starts, end = load_notes(filepath)
+    offsets = (-width, -1, 1, width)
+    step_cost = [[1 + min_transition(a, b) for b in range(10)] for a in range(10)]
+    max_step = 1 + min_transition(0, 5)
+
+    costs = array("q", [-1]) * len(heights)
+    for start in starts:
+        costs[start] = 0
+    buckets = [[] for _ in range(max_step + 1)]
+    buckets[0] = list(starts)
+    pending = len(starts)
+    settled = bytearray(len(heights))
+    cost = 0
+
+    while pending:
+        bucket = buckets[cost % len(buckets)]
+        while bucket:
+            position = bucket.pop()
+            pending -= 1
+            if settled[position] or costs[position] != cost:
                 continue
-
-            new_cost = min(possible_costs)
-            if new_cost < costs[position]:
-                costs[position] = new_cost
-                next_visit.update(neighbors)
-
-        to_visit = next_visit
-
-    # Return the best (minimum) cost among all start points
-    return min(costs[start] for start in starts)
+            settled[position] = 1
+            if position == end:
+                return cost
+            costs_from_here = step_cost[heights[position]]
+            for offset in offsets:
+                neighbor = position + offset
+                height = heights[neighbor]
+                if height == WALL or settled[neighbor]:
+                    continue
+                new_cost = cost + costs_from_here[height]
+                if costs[neighbor] == -1 or new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    buckets[new_cost % len(buckets)].append(neighbor)
+                    pending += 1
+        cost += 1
+
+    # The end cannot be reached from any start point
+    return inf
 
 
 if __name__ == "__main__":
@@ -3,9 +3,10 @@ The Kingdom of Algorithmia [2024]
 Quest 14: The House of Palms
 https://everybody.codes/event/2024/quests/14
 """
-from collections import deque
 from math import inf
 from pathlib import Path
+from typing import Iterator
+import numpy as np
 
 # Directions in 3D space
 MOVES = {
@@ -17,6 +18,27 @@ MOVES = {
     'U': (0, 1, 0),
 }
 
+# Voxels are packed into single int64 keys, 21 bits per offset coordinate
+AXIS_BITS = 21
+AXIS_OFFSET = 1 << (AXIS_BITS - 1)
+AXIS_MASK = (1 << AXIS_BITS) - 1
+
+
+def pack(x, y, z):
+    """Pack 3D coordinates (ints or NumPy arrays) into voxel keys."""
+    return ((x + AXIS_OFFSET) << (2 * AXIS_BITS)) | ((y + AXIS_OFFSET) << AXIS_BITS) | (z + AXIS_OFFSET)
+
+
+def unpack(key: int) -> tuple[int, int, int]:
+    """Unpack a voxel key into its (x, y, z) coordinates."""
+    return ((key >> (2 * AXIS_BITS)) - AXIS_OFFSET,
+            ((key >> AXIS_BITS) & AXIS_MASK) - AXIS_OFFSET,
+            (key & AXIS_MASK) - AXIS_OFFSET)
+
+
+# Key differences between neighbouring voxels
+KEY_MOVES = [pack(dx, dy, dz) - pack(0, 0, 0) for dx, dy, dz in MOVES.values()]
+
 
 def parse_branches(filepath: str) -> list[list[tuple[str, int]]]:
     """
@@ -42,24 +64,28 @@ def part1(filepath: str = "../input/everybody_codes_e2024_q14_p1.txt") -> None:
     print("Part 1:", max_height)
 
 
-def build_tree(branches: list[list[tuple[str, int]]]) -> set[tuple[int, int, int]]:
+def build_tree(branches: list[list[tuple[str, int]]]) -> set[int]:
     """
-    Expand all branch paths into a set of occupied 3D coordinates (segments).
+    Expand all branch paths into a set of occupied voxel keys (segments).
+
+    Each run of a branch is generated as one np.arange, and the packed keys
+    are deduplicated in bulk with np.unique before being hashed into a set.
     """
-    segments = set()
+    runs = [np.array([pack(0, 0, 0)], dtype=np.int64)]  # root included
 
     for branch in branches:
         x = y = z = 0
-        segments.add((x, y, z))  # root included
         for direction, distance in branch:
             dx, dy, dz = MOVES[direction]
-            for _ in range(distance):
-                x += dx
-                y += dy
-                z += dz
-                segments.add((x, y, z))
+            steps = np.arange(1, distance + 1, dtype=np.int64)
+            runs.append(pack(x + dx * steps, y + dy * steps, z + dz * steps))
+            x += dx * distance
+            y += dy * distance
+            z += dz * distance
+            # Runs are straight, so checking their ends keeps every key in range
+            assert max(abs(x), abs(y), abs(z)) < AXIS_OFFSET, "branch too long to pack into voxel keys"
 
-    return segments
+    return set(np.unique(np.concatenate(runs)).tolist())
 
 
 def part2(filepath: str = "../input/everybody_codes_e2024_q14_p2.txt") -> None:
@@ -69,9 +95,9 @@ def part2(filepath: str = "../input/everybody_codes_e2024_q14_p2.txt") -> None:
     print("Part 2:", len(tree_with_root) - 1)
     
 
-def find_leaves(branches: list[list[tuple[str, int]]]) -> set[tuple[int, int, int]]:
+def find_leaves(branches: list[list[tuple[str, int]]]) -> set[int]:
     """
-    Determine the 3D coordinates of all leaf endpoints (end of each branch).
+    Determine the voxel keys of all leaf endpoints (end of each branch).
     """
     leaves = set()
     for branch in branches:
@@ -81,42 +107,86 @@ def find_leaves(branches: list[list[tuple[str, int]]]) -> set[tuple[int, int, in
             x += dx * distance
             y += dy * distance
             z += dz * distance
-        leaves.add((x, y, z))
+        leaves.add(pack(x, y, z))
     return leaves
 
 
-def find_trunk(segments: set[tuple[int, int, int]]) -> set[tuple[int, int, int]]:
+def find_trunk(segments: set[int]) -> set[int]:
     """
     Identify all main trunk segments (all positions directly above root).
     """
-    return {(x, y, z) for (x, y, z) in segments if x == 0 and z == 0 and y >= 0}
+    root = pack(0, 0, 0)
+    return {key for key in segments
+            if key >> (2 * AXIS_BITS) == AXIS_OFFSET and key & AXIS_MASK == AXIS_OFFSET and key >= root}
 
 
-def bfs_distance_sum(start: tuple[int, int, int],
-                     leaves: set[tuple[int, int, int]],
-                     segments: set[tuple[int, int, int]]) -> int:
+def multi_source_bfs(sources: list[int], segments: set[int]) -> Iterator[tuple[int, dict[int, int]]]:
     """
-    Compute total distance from a trunk segment to all leaves via BFS.
-    Stop early if all leaves have been reached.
-    """
-    queue = deque([(start, 0)])
-    visited = {start}
-    total = 0
-    reached = 0
+    Bit-parallel BFS from many sources at once.
 
-    while queue and reached < len(leaves):
-        (x, y, z), dist = queue.popleft()
-        if (x, y, z) in leaves:
-            total += dist
-            reached += 1
-
-        for dx, dy, dz in MOVES.values():
-            nxt = (x + dx, y + dy, z + dz)
-            if nxt in segments and nxt not in visited:
-                visited.add(nxt)
-                queue.append((nxt, dist + 1))
+    Each segment holds a bitmask of the sources that have reached it, and
+    each layer only pushes the newly arrived bits onwards. Yields every
+    layer's distance with the segments reached in it, mapped to the bits
+    of the sources arriving there for the first time.
+    """
+    frontier = {source: 0 for source in sources}
+    for i, source in enumerate(sources):
+        frontier[source] |= 1 << i
+    seen = dict(frontier)
+    dist = 0
+    while frontier:
+        yield dist, frontier
+
+        next_frontier = {}
+        for key, mask in frontier.items():
+            for move in KEY_MOVES:
+                nxt = key + move
+                if nxt in segments:
+                    new = mask & ~seen.get(nxt, 0)
+                    if new:
+                        next_frontier[nxt] = next_frontier.get(nxt, 0) | new
+        for position, mask in next_frontier.items():
+            seen[position] = seen.get(position, 0) | mask
+        frontier = next_frontier
+        dist += 1
+
+
+def trunk_distance_sums(leaves: set[int], segments: set[int], trunk: set[int]) -> list[float]:
+    """
+    Compute, for every trunk height, the total distance to all leaves.
 
-    return total if reached == len(leaves) else inf
+    Distances are symmetric, so a single multi-source BFS is run from
+    whichever side is smaller, the leaves or the trunk segments, and each
+    first arrival adds its distance into that trunk height's accumulator.
+    Heights some leaf cannot reach are left at inf.
+    """
+    height = max(unpack(key)[1] for key in trunk) + 1
+    sums = [0] * height
+    reached = [0] * height
+
+    if len(leaves) <= len(trunk):
+        for dist, layer in multi_source_bfs(list(leaves), segments):
+            for key, mask in layer.items():
+                if key in trunk:
+                    y = unpack(key)[1]
+                    arrivals = mask.bit_count()
+                    sums[y] += dist * arrivals
+                    reached[y] += arrivals
+    else:
+        taps = sorted(trunk)
+        tap_heights = [unpack(key)[1] for key in taps]
+        for dist, layer in multi_source_bfs(taps, segments):
+            for position, mask in layer.items():
+                if position not in leaves:
+                    continue
+                while mask:
+                    bit = mask & -mask
+                    y = tap_heights[bit.bit_length() - 1]
+                    sums[y] += dist
+                    reached[y] += 1
+                    mask ^= bit
+
+    return [total if reached[y] == len(leaves) else inf for y, total in enumerate(sums)]
 
 
 def part3(filepath: str = "../input/everybody_codes_e2024_q14_p3.txt") -> None:
@@ -126,7 +196,8 @@ def part3(filepath: str = "../input/everybody_codes_e2024_q14_p3.txt") -> None:
     trunk = find_trunk(segments)
 
     print(f"Segments: {len(segments)}, Leaves: {len(leaves)}, Trunk segments: {len(trunk)}")
-    murkiness = min(bfs_distance_sum(tap, leaves, segments) for tap in trunk)
+    sums = trunk_distance_sums(leaves, segments, trunk)
+    murkiness = min(sums[unpack(key)[1]] for key in trunk)
 
     print("Part 3:", murkiness)
 
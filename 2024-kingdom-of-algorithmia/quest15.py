@@ -3,45 +3,202 @@ The Kingdom of Algorithmia [2024]
 Quest 15: From the Herbalist's Diary
 https://everybody.codes/event/2024/quests/15
 """
-from collections import deque
+from math import inf
 from pathlib import Path
+from typing import Iterator
+import numpy as np
+
+
+def load_map(lines: list[str]) -> tuple[bytes, int, int]:
+    """
+    Pad the herb map with walls into a flat byte grid.
+
+    Returns the grid, its padded row width and the index of the start,
+    the open cell on the top row.
+    """
+    width = max(map(len, lines)) + 2
+    rows = ["#" * width] + [f"#{line:#<{width - 2}}#" for line in lines] + ["#" * width]
+    grid = "".join(rows).encode()
+    return grid, width, width + 1 + lines[0].index(".")
+
+
+def to_bitboard(region: bytearray) -> int:
+    """Pack a flat 0/1 cell array into a bitboard, bit i standing for cell i."""
+    return int.from_bytes(np.packbits(np.frombuffer(bytes(region), dtype=np.uint8), bitorder="little"), "little")
+
+
+def bfs_layers(walkable: int, width: int, source: int) -> Iterator[int]:
+    """
+    Bit-parallel BFS over a bitboard of walkable cells.
+
+    Yields the frontier of each layer as a bitboard, one step at a time,
+    advancing the whole frontier with shift-and-AND against `walkable`.
+    The map's wall border keeps shifts from wrapping between rows.
+    """
+    frontier = seen = 1 << source
+    while frontier:
+        yield frontier
+        spread = frontier << 1 | frontier >> 1 | frontier << width | frontier >> width
+        frontier = spread & walkable & ~seen
+        seen |= frontier
+
+
+def bits(board: int) -> Iterator[int]:
+    """Yield the index of every set bit of a bitboard."""
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+
+def bfs_distances(walkable: int, width: int, source: int, targets: list[int]) -> list[float]:
+    """Return the step distance from `source` to each of `targets` (inf if unreachable)."""
+    dist = dict.fromkeys(targets, inf)
+    remaining = 0
+    for cell in dist:
+        remaining |= 1 << cell
+    for steps, frontier in enumerate(bfs_layers(walkable, width, source)):
+        hit = frontier & remaining
+        if hit:
+            for cell in bits(hit):
+                dist[cell] = steps
+            remaining ^= hit
+            if not remaining:
+                break
+    return [dist[cell] for cell in targets]
+
+
+def chokepoint_regions(grid: bytes, region: bytearray, width: int, start: int) -> list[tuple[int, list[int]]]:
+    """
+    Find the parts of `region` that hang off a single chokepoint cell and
+    hold every herb of their types, while some herb other than one on the
+    start lies outside.
+
+    A depth-first search from the start gives, for each articulation point v
+    with child u where low[u] >= disc[v], the subtree of u as the part only
+    reachable through v. The outermost qualifying parts are returned as
+    (chokepoint, cells) pairs.
+    """
+    disc, low, end, parent = {start: 0}, {start: 0}, {}, {}
+    order = [start]
+    stack = [(start, iter((start - width, start - 1, start + 1, start + width)))]
+    while stack:
+        cell, neighbors = stack[-1]
+        for nxt in neighbors:
+            if not region[nxt]:
+                continue
+            if nxt not in disc:
+                disc[nxt] = low[nxt] = len(order)
+                parent[nxt] = cell
+                order.append(nxt)
+                stack.append((nxt, iter((nxt - width, nxt - 1, nxt + 1, nxt + width))))
+                break
+            low[cell] = min(low[cell], disc[nxt])
+        else:
+            stack.pop()
+            end[cell] = len(order)
+            if stack:
+                low[parent[cell]] = min(low[parent[cell]], low[cell])
+
+    # Herb counts per type along the DFS order, to count any subtree in O(types)
+    herbs = {cell: chr(grid[cell]) for cell in order if chr(grid[cell]) not in "#.~"}
+    prefix = {herb: [0] * (len(order) + 1) for herb in set(herbs.values())}
+    for herb, counts in prefix.items():
+        for i, cell in enumerate(order):
+            counts[i + 1] = counts[i] + (herbs.get(cell) == herb)
+
+    regions = []
+    covered_until = -1
+    for u in order[1:]:
+        i, j = disc[u], end[u]
+        if i < covered_until or low[u] < disc[parent[u]]:
+            continue
+        inside = {herb: counts[j] - counts[i] for herb, counts in prefix.items()}
+        if not any(inside.values()):
+            continue
+        exclusive = all(n == prefix[herb][-1] for herb, n in inside.items() if n)
+        # The start's own herb costs nothing, so it does not count as outside
+        herbs_outside = any(prefix[herb][-1] - n - (herbs.get(start) == herb) for herb, n in inside.items())
+        if exclusive and herbs_outside:
+            regions.append((parent[u], order[i:j]))
+            covered_until = j
+    return regions
+
+
+def herb_tour(grid: bytes, region: bytearray, width: int, start: int) -> int:
+    """
+    Length of the shortest walk from `start` back to `start` collecting
+    one herb of every type found in `region`, or inf if some type cannot
+    be reached.
+
+    Parts of the map that hang off a chokepoint with herbs of their own are
+    solved separately and stand in as a single stop at the chokepoint.
+    The remaining stops are ordered with a Held-Karp DP over bitmasks of
+    collected items, minimising over the instances of each item. Distances
+    come from bit-parallel BFS layers over a bitboard of the region.
+    """
+    region = bytearray(region)
+    # Each item is a list of (cell, extra cost) instances
+    items = []
+    collected = set()
+    for chokepoint, cells in chokepoint_regions(grid, region, width, start):
+        sub_region = bytearray(len(region))
+        for cell in cells + [chokepoint]:
+            sub_region[cell] = 1
+        items.append([(chokepoint, herb_tour(grid, sub_region, width, chokepoint))])
+        for cell in cells:
+            region[cell] = 0
+            collected.add(chr(grid[cell]))
+
+    walkable = to_bitboard(region)
+    reachable = 0
+    for frontier in bfs_layers(walkable, width, start):
+        reachable |= frontier
+
+    instances = {}
+    herb_cells = to_bitboard(bytearray(ch not in b"#.~" for ch in grid))
+    for cell in bits(reachable & herb_cells):
+        instances.setdefault(chr(grid[cell]), []).append((cell, 0))
+    # Every herb type of the region must be reachable
+    required = {chr(ch) for ch, inside in zip(grid, region) if inside and ch not in b"#.~"}
+    if required - collected - instances.keys():
+        return inf
+    items += instances.values()
+    if not items:
+        return 0
+
+    # Pairwise distances between the start and every instance
+    nodes = [(start, 0)] + [instance for item in items for instance in item]
+    cells = [cell for cell, _ in nodes]
+    dist = np.array([bfs_distances(walkable, width, cell, cells) for cell in cells])
+    extra = np.array([cost for _, cost in nodes], dtype=float)
+    item_nodes, first = [], 1
+    for item in items:
+        item_nodes.append(np.arange(first, first + len(item)))
+        first += len(item)
+
+    # dp[mask, node]: shortest walk from the start collecting `mask`, ending at `node`
+    full = (1 << len(items)) - 1
+    dp = np.full((full + 1, len(nodes)), inf)
+    dp[0, 0] = 0
+    for mask in range(full + 1):
+        row = dp[mask]
+        if not np.isfinite(row).any():
+            continue
+        for j, targets in enumerate(item_nodes):
+            if mask >> j & 1:
+                continue
+            reach = (row[:, None] + dist[:, targets]).min(axis=0) + extra[targets]
+            dp[mask | 1 << j, targets] = np.minimum(dp[mask | 1 << j, targets], reach)
+
+    best = (dp[full] + dist[:, 0]).min()
+    return int(best) if np.isfinite(best) else inf
 
 
 def shortest_path(lines: list[str]) -> int:
-    start_r = 0
-    start_c = lines[0].index('.')
-
-    to_collect = tuple(sorted({ch for line in lines for ch in line if ch not in "#.~"}))
-
-    q = deque([(start_r, start_c, tuple())])
-    d = 0
-    seen = {(start_r, start_c)}
-    while q:
-        # Prune
-        if len(q) >= 15000:
-            q = list(q)
-            q.sort(key=lambda state: -10000 * len(state[2]) + state[0])
-            q = deque(q[:2000])
-
-        for _ in range(len(q)):
-            r, c, collected = q.popleft()
-
-            if collected == to_collect and (r, c) == (0, start_c):
-                return d
-
-            for dr, dc in [(-1, 0), (0, -1), (0, 1), (1, 0)]:
-                r2 = r + dr
-                c2 = c + dc
-                if r2 < 0 or lines[r2][c2] in "#~" or (r2, c2, collected) in seen:
-                    continue
-
-                new_collected = collected
-                if lines[r2][c2] != '.' and lines[r2][c2] not in collected:
-                    new_collected = tuple(sorted(collected + (lines[r2][c2],)))
-
-                seen.add((r2, c2, new_collected))
-                q.append((r2, c2, new_collected))
-        d += 1
+    grid, width, start = load_map(lines)
+    region = bytearray(ch not in b"#~" for ch in grid)
+    return herb_tour(grid, region, width, start)
 
 
 if __name__ == "__main__":
@@ -3,9 +3,9 @@ The Kingdom of Algorithmia [2024]
 Quest 16: Cat Grin of Fortune
 https://everybody.codes/event/2024/quests/16
 """
-from collections import Counter
+from math import gcd, lcm
 from pathlib import Path
-from typing import Callable
+import numpy as np
 
 
 def load_input(filepath: str):
@@ -69,67 +69,71 @@ def part1(filepath: str = "../input/everybody_codes_e2024_q16_p1.txt") -> None:
     print("Part 1:", " ".join(chosen))
 
 
-def compute_score(columns: list[list[str]], state: list[int]) -> int:
+def face_codes(cat_faces: list[list[str]]) -> tuple[list[np.ndarray], int]:
     """
-    Given the current state (which face index each column is showing),
-    calculate the score based on letter repetition rules.
-    """
-    counts = Counter()
-
-    # Count first and last characters of each face
-    for col_idx, pos in enumerate(state):
-        face = columns[col_idx][pos]
-        counts[face[0]] += 1
-        counts[face[2]] += 1
+    Encode the first and last character of every face as dense integer codes.
 
-    # For each character, every occurrence beyond 2 adds 1 to the score
-    return sum(max(0, v - 2) for v in counts.values())
+    Returns one (faces, 2) array per wheel and the number of distinct codes.
+    """
+    alphabet = {ch: i for i, ch in enumerate(sorted({face[k] for column in cat_faces
+                                                     for face in column for k in (0, 2)}))}
+    codes = [np.array([[alphabet[face[0]], alphabet[face[2]]] for face in column], dtype=np.int64)
+             for column in cat_faces]
+    return codes, len(alphabet)
 
 
-def simulate(xs: list[int], columns: list[list[str]], total_steps: int = 202420242024) -> int:
+def count_coins(codes: list[np.ndarray], positions: list[np.ndarray], num_codes: int) -> np.ndarray:
     """
-    Simulate the face rotation and scoring process for N steps.
+    Calculate the coins for many wheel settings at once.
 
-    - Each column cycles through its faces according to xs[i].
-    - Each step computes a score based on character repetition.
-    - A cycle-detection dictionary (DP) is used to skip ahead efficiently
-      once a repeated state is found.
+    positions[i][k] is the face wheel i shows in setting k. Characters are
+    counted for all settings with bincount, and each character seen 3 or
+    more times earns (count - 2) coins.
     """
-    num_cols = len(columns)
-    state = [0] * num_cols  # initial indices for each column
-    t = 0
-    total_score = 0
-    seen_states = {}  # maps state -> (time, score_at_that_time)
+    width = len(positions[0])
+    counts = np.zeros(num_codes * width, dtype=np.int64)
+    columns = np.arange(width)
+    for wheel, position in zip(codes, positions):
+        faces = wheel[position]
+        for k in range(2):
+            counts += np.bincount(faces[:, k] * width + columns, minlength=num_codes * width)
+    return np.maximum(counts.reshape(num_codes, width) - 2, 0).sum(axis=0)
 
-    while t < total_steps:
-        t += 1
 
-        # Update state (like a modular counter for each column)
-        state = [(state[i] + xs[i]) % len(columns[i]) for i in range(num_cols)]
-        key = tuple(state)
+def coins_by_offset(codes: list[np.ndarray], rotations: list[int], step: int,
+                    offsets: np.ndarray, num_codes: int) -> np.ndarray:
+    """
+    Calculate the coins for every lever offset after `step` right-lever turns.
 
-        # Check if this configuration has been seen before → detect loop
-        if key in seen_states:
-            prev_time, prev_score = seen_states[key]
-            cycle_length = t - prev_time
-            cycle_score = total_score - prev_score
+    With offset o, wheel i shows face (step * rotations[i] + o) % len(wheel).
+    """
+    positions = [(step * rotation + offsets) % len(wheel) for wheel, rotation in zip(codes, rotations)]
+    return count_coins(codes, positions, num_codes)
 
-            # Jump ahead as many full cycles as possible
-            remaining = total_steps - t
-            full_cycles = remaining // cycle_length
 
-            if full_cycles > 0:
-                t += full_cycles * cycle_length
-                total_score += full_cycles * cycle_score
+def simulate(xs: list[int], columns: list[list[str]], total_steps: int = 202420242024,
+             chunk_size: int = 1_000_000) -> int:
+    """
+    Score the face rotation process over N steps.
 
-        else:
-            seen_states[key] = (t, total_score)
+    - Each column cycles through its faces according to xs[i].
+    - Column i returns to its start every len/gcd(len, xs[i]) steps, so the
+      whole machine repeats with the lcm of those periods.
+    - The scores of one period are evaluated vectorially, `chunk_size`
+      steps at a time, and multiplied out to N steps.
+    """
+    period = lcm(*(len(column) // gcd(len(column), x) for x, column in zip(xs, columns)))
+    full_cycles, remainder = divmod(total_steps, period)
+    codes, num_codes = face_codes(columns)
 
-        # Compute score for current state
-        step_score = compute_score(columns, state)
-        total_score += step_score
+    cycle_score = partial_score = 0
+    for first in range(1, period + 1, chunk_size):
+        steps = np.arange(first, min(first + chunk_size, period + 1), dtype=np.int64)
+        scores = count_coins(codes, [steps * x % len(column) for x, column in zip(xs, columns)], num_codes)
+        cycle_score += int(scores.sum())
+        partial_score += int(scores[steps <= remainder].sum())
 
-    return total_score
+    return full_cycles * cycle_score + partial_score
 
 
 def part2(filepath: str = "../input/everybody_codes_e2024_q16_p2.txt") -> None:
@@ -171,105 +175,50 @@ def load_machine_input(filepath: str = "../input/everybody_codes_e2024_q16_p3.tx
     return rotations, cat_faces, face_counts
 
 
-def right_lever(indexes: list[int], rotations: list[int], max_values: list[int]) -> list[int]:
-    """Advance each wheel by its rotation speed (the 'right lever')."""
-    return [(indexes[i] + rotations[i]) % max_values[i] for i in range(len(indexes))]
-
-
-def pull(indexes: list[int], max_values: list[int]) -> list[int]:
-    """Increment each wheel by 1 (the 'pull lever')."""
-    return [(indexes[i] + 1) % max_values[i] for i in range(len(indexes))]
-
-
-def push(indexes: list[int], max_values: list[int]) -> list[int]:
-    """Decrement each wheel by 1 (the 'push lever')."""
-    return [(indexes[i] - 1) % max_values[i] for i in range(len(indexes))]
-
-
-def get_cat_faces(cat_faces: list[list[str]], indexes: list[int]) -> list[str]:
-    """Return the visible face from each column for the given indexes."""
-    return [cat_faces[i][indexes[i]] for i in range(len(cat_faces))]
-
-
-def get_coins(faces: list[str]) -> int:
-    """
-    Calculate coins from the current visible faces.
-    Each face contributes its first and last character.
-    If a character appears 3 or more times, you earn (count - 2) coins.
-    """
-    chars = "".join(face[0] + face[2] for face in faces)
-    freq = {}
-    for ch in chars:
-        freq[ch] = freq.get(ch, 0) + 1
-    return sum(max(0, count - 2) for count in freq.values())
-
-
 def find_rotations(
     rotations: list[int],
     max_values: list[int],
     cat_faces: list[list[str]],
     steps: int,
-    choose_fn: Callable[[int, int, int], int],
+    choose_fn: np.ufunc,
 ) -> int:
     """
     Dynamic programming over all possible lever actions for a fixed number of steps.
 
-    States:
-        (indexes, remaining_steps) -> best achievable score
-
-    Transitions:
-        - no action: just rotate via right lever
-        - pull lever: increment all indexes by 1, then rotate
-        - push lever: decrement all indexes by 1, then rotate
-
-    The DP is implemented iteratively using a manual stack
-    to avoid Python recursion limits.
-    """
-    dp = {}
-    stack = [([0] * len(cat_faces), steps)]
-
-    while stack:
-        indexes, remaining = stack.pop()
-        key = (tuple(indexes), remaining)
-
-        if key in dp:
-            continue
-        if remaining == 0:
-            dp[key] = 0
-            continue
-
-        # Compute possible next states
-        no_action = right_lever(indexes, rotations, max_values)
-        pull_action = right_lever(pull(indexes, max_values), rotations, max_values)
-        push_action = right_lever(push(indexes, max_values), rotations, max_values)
-
-        next_keys = [
-            (tuple(no_action), remaining - 1),
-            (tuple(pull_action), remaining - 1),
-            (tuple(push_action), remaining - 1),
-        ]
-
-        # Ensure dependencies are processed before this one
-        if any(k not in dp for k in next_keys):
-            stack.append((indexes, remaining))
-            for k in next_keys:
-                if k not in dp:
-                    stack.append(k)
-            continue
-
-        # Compute coin outcomes for each lever choice
-        coins_no = get_coins(get_cat_faces(cat_faces, no_action))
-        coins_pull = get_coins(get_cat_faces(cat_faces, pull_action))
-        coins_push = get_coins(get_cat_faces(cat_faces, push_action))
-
-        total_no = coins_no + dp[(tuple(no_action), remaining - 1)]
-        total_pull = coins_pull + dp[(tuple(pull_action), remaining - 1)]
-        total_push = coins_push + dp[(tuple(push_action), remaining - 1)]
-
-        # Choose max or min depending on decider function
-        dp[key] = choose_fn(total_no, total_pull, total_push)
+    All wheels move together, so after t steps wheel i shows face
+    (t * rotations[i] + o) % max_values[i] for a single lever offset o in
+    [-t, t]. Each layer holds the best score for every offset and is built
+    from the previous one with vectorised shifts:
+        best[t][o] = coins(t, o) + choose(best[t-1][o-1], best[t-1][o], best[t-1][o+1])
+
+    Offsets only matter modulo the lcm of the wheel sizes, so when that is
+    smaller than the offset range the layer wraps around instead.
+
+    `choose_fn` is np.maximum or np.minimum.
+    """
+    codes, num_codes = face_codes(cat_faces)
+    period = lcm(*max_values)
+    cyclic = period <= 2 * steps + 1
+    if cyclic:
+        offsets = np.arange(period)
+    else:
+        offsets = np.arange(-steps, steps + 1)
+    # Offsets not reachable yet hold a score that never gets chosen
+    unreachable = np.iinfo(np.int64).min // 4 if choose_fn is np.maximum else np.iinfo(np.int64).max // 4
+
+    best = np.full(len(offsets), unreachable, dtype=np.int64)
+    best[0 if cyclic else steps] = 0
+    for step in range(1, steps + 1):
+        if cyclic:
+            pulled, pushed = np.roll(best, 1), np.roll(best, -1)
+        else:
+            pulled = np.concatenate(([unreachable], best[:-1]))
+            pushed = np.concatenate((best[1:], [unreachable]))
+        previous = choose_fn(best, choose_fn(pulled, pushed))
+        best = np.where(previous == unreachable, unreachable,
+                        previous + coins_by_offset(codes, rotations, step, offsets, num_codes))
 
-    return dp[(tuple([0] * len(cat_faces)), steps)]
+    return int(choose_fn.reduce(best[best != unreachable]))
 
 
 def part3(filepath: str = "../input/everybody_codes_e2024_q16_p3.txt") -> None:
@@ -277,8 +226,8 @@ def part3(filepath: str = "../input/everybody_codes_e2024_q16_p3.txt") -> None:
 
     steps = 256
 
-    max_score = find_rotations(rotations, face_counts, cat_faces, steps, max)
-    min_score = find_rotations(rotations, face_counts, cat_faces, steps, min)
+    max_score = find_rotations(rotations, face_counts, cat_faces, steps, np.maximum)
+    min_score = find_rotations(rotations, face_counts, cat_faces, steps, np.minimum)
 
     print(f"Part 3: {max_score} {min_score}")
 
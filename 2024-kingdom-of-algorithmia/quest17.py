@@ -3,10 +3,10 @@ The Kingdom of Algorithmia [2024]
 Quest 17: Galactic Geometry
 https://everybody.codes/event/2024/quests/17
 """
-import heapq
 from collections import defaultdict
-from itertools import combinations
+from math import inf
 from pathlib import Path
+import numpy as np
 
 
 def load_star_map(filepath: str) -> list[tuple[int, int]]:
@@ -28,44 +28,155 @@ def manhattan(a: tuple[int, int], b: tuple[int, int]) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def minimum_spanning_tree(stars: list[tuple[int, int]]) -> int:
+def find(parent: list[int], i: int) -> int:
+    """Find the root of i in an array-based disjoint set, halving paths as it goes."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def kruskal(num_nodes: int, edges: list[tuple[int, int, int]]) -> tuple[list[int], list[tuple[int, int, int]]]:
+    """
+    Run Kruskal's algorithm over (distance, i, j) edges with an array DSU.
+
+    Returns the final parent array and the edges of the minimum spanning forest.
+    """
+    parent = list(range(num_nodes))
+    size = [1] * num_nodes
+    forest = []
+    for edge in sorted(edges):
+        _, i, j = edge
+        root_i, root_j = find(parent, i), find(parent, j)
+        if root_i == root_j:
+            continue
+        if size[root_i] < size[root_j]:
+            root_i, root_j = root_j, root_i
+        parent[root_j] = root_i
+        size[root_i] += size[root_j]
+        forest.append(edge)
+        if len(forest) == num_nodes - 1:
+            break
+    return parent, forest
+
+
+def manhattan_mst_edges(stars: list[tuple[int, int]]) -> list[tuple[int, int, int]]:
+    """
+    Generate the O(n) candidate edges that contain a Manhattan MST.
+
+    For every star only the nearest star in each octant can be an MST
+    neighbour. Four sweeps over rotated/reflected coordinates cover all
+    octants: stars are taken in decreasing x, and a Fenwick tree over the
+    compressed y - x keys returns the star with the smallest x + y among
+    those with x' >= x and y' - x' >= y - x.
+    """
+    points = [list(star) for star in stars]
+    n = len(points)
+    edges = []
+    for direction in range(4):
+        if direction in (1, 3):
+            for p in points:
+                p[0], p[1] = p[1], p[0]
+        elif direction == 2:
+            for p in points:
+                p[0] = -p[0]
+
+        order = sorted(range(n), key=lambda i: (points[i][0], points[i][1]))
+        keys = sorted({points[i][1] - points[i][0] for i in range(n)})
+        rank = {key: r for r, key in enumerate(keys)}
+        # Fenwick tree over reversed key ranks holding (min x + y, star)
+        tree = [(inf, -1)] * (len(keys) + 1)
+        for i in reversed(order):
+            x, y = points[i]
+            position = len(keys) - rank[y - x]
+            best = (inf, -1)
+            k = position
+            while k > 0:
+                best = min(best, tree[k])
+                k -= k & -k
+            if best[1] >= 0:
+                edges.append((best[0] - x - y, i, best[1]))
+            k = position
+            while k <= len(keys):
+                tree[k] = min(tree[k], (x + y, i))
+                k += k & -k
+    return edges
+
+
+def dense_prim(stars: list[tuple[int, int]]) -> int:
+    """Array-based O(n^2) Prim's algorithm, returning the total MST length."""
+    ys = np.array([y for y, _ in stars])
+    xs = np.array([x for _, x in stars])
+    in_tree = np.zeros(len(stars), dtype=bool)
+    dist = np.full(len(stars), np.iinfo(np.int64).max)
+    dist[0] = 0
+    total_length = 0
+    for _ in range(len(stars)):
+        current = int(np.argmin(np.where(in_tree, np.iinfo(np.int64).max, dist)))
+        in_tree[current] = True
+        total_length += int(dist[current])
+        np.minimum(dist, np.abs(ys - ys[current]) + np.abs(xs - xs[current]), out=dist)
+    return total_length
+
+
+def minimum_spanning_tree(stars: list[tuple[int, int]], dense_limit: int = 2000) -> int:
     """
     Compute the total weight of a Minimum Spanning Tree (MST)
     connecting all stars using Manhattan distance as edge weights.
-    
+
+    Small maps use a dense array-based Prim; larger ones run Kruskal over
+    the octant-sweep candidate edges.
+
     Returns:
         The total MST length plus the number of connected nodes.
     """
     if not stars:
         return 0
 
-    total_length = 0
-    visited = set()
-    pq = [(0, stars[0])]  # (distance, star)
+    if len(stars) <= dense_limit:
+        total_length = dense_prim(stars)
+    else:
+        _, forest = kruskal(len(stars), manhattan_mst_edges(stars))
+        total_length = sum(d for d, _, _ in forest)
 
-    while pq:
-        dist, current = heapq.heappop(pq)
-        if current in visited:
-            continue
-        visited.add(current)
-        total_length += dist
+    # Add the number of stars for the "node contribution" defined by the problem
+    return total_length + len(stars)
 
-        # Add neighbors (all remaining stars)
-        for neighbor in stars:
-            if neighbor not in visited:
-                heapq.heappush(pq, (manhattan(current, neighbor), neighbor))
 
-    # Add len(visited) for the "node contribution" defined by the problem
-    return total_length + len(visited)
+def short_edges(stars: list[tuple[int, int]], limit: int = 6) -> list[tuple[int, int, int]]:
+    """
+    Find every pair of stars closer than `limit` as (distance, i, j) edges.
+
+    Stars are bucketed into a grid hash with cells of size `limit`, so only
+    stars in the same or neighbouring buckets need comparing.
+    """
+    buckets = defaultdict(list)
+    for i, (y, x) in enumerate(stars):
+        buckets[(y // limit, x // limit)].append(i)
+
+    edges = []
+    for (by, bx), members in buckets.items():
+        # Compare with this bucket and half of the neighbours, so each pair is seen once
+        for dy, dx in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            others = buckets.get((by + dy, bx + dx))
+            if not others:
+                continue
+            for a, i in enumerate(members):
+                for j in (members[a + 1:] if (dy, dx) == (0, 0) else others):
+                    d = manhattan(stars[i], stars[j])
+                    if d < limit:
+                        edges.append((d, i, j))
+    return edges
 
 
 def brilliant_constellations(stars: list[tuple[int, int]]) -> int:
     """
     Group stars into 'brilliant constellations' where any two stars
     within Manhattan distance < 6 belong to the same constellation.
-    
-    For each cluster, compute a local MST (via Prim’s algorithm)
-    and record its size (MST total distance + number of nodes).
+
+    Kruskal over the short edges found via a spatial hash gives both the
+    constellations and each one's MST at once. Each constellation's size
+    is its MST total distance plus its number of nodes.
 
     Returns:
         The product of the sizes of the 3 largest constellations.
@@ -73,43 +184,16 @@ def brilliant_constellations(stars: list[tuple[int, int]]) -> int:
     if not stars:
         return 0
 
-    # Build adjacency list for stars within distance < 6
-    adjacency = defaultdict(list)
-    for s1, s2 in combinations(stars, 2):
-        d = manhattan(s1, s2)
-        if d < 6:
-            adjacency[s1].append((d, s2))
-            adjacency[s2].append((d, s1))
-
-    remaining = set(stars)
-    cluster_sizes = []
-
-    # Explore connected components using Prim’s algorithm
-    while remaining:
-        start = remaining.pop()
-        pq = [(0, start)]
-        seen = set()
-        total_distance = 0
-
-        while pq:
-            dist, node = heapq.heappop(pq)
-            if node in seen:
-                continue
-            seen.add(node)
-            total_distance += dist
-
-            for ndist, neighbor in adjacency[node]:
-                if neighbor not in seen:
-                    heapq.heappush(pq, (ndist, neighbor))
-
-        # Store cluster size
-        cluster_sizes.append(total_distance + len(seen))
+    parent, forest = kruskal(len(stars), short_edges(stars))
 
-        # Remove visited nodes from remaining
-        remaining -= seen
+    cluster_sizes = defaultdict(int)
+    for i in range(len(stars)):
+        cluster_sizes[find(parent, i)] += 1
+    for d, i, _ in forest:
+        cluster_sizes[find(parent, i)] += d
 
     # Compute the product of the three largest clusters
-    cluster_sizes.sort()
+    cluster_sizes = sorted(cluster_sizes.values())
     if len(cluster_sizes) < 3:
         return 0  # not enough constellations to multiply
 
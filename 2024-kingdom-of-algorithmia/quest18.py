@@ -3,9 +3,12 @@ The Kingdom of Algorithmia [2024]
 Quest 18: The Ring
 https://everybody.codes/event/2024/quests/18
 """
-from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from math import inf
+from multiprocessing import shared_memory
 from pathlib import Path
+from typing import Iterator
+import numpy as np
 
 
 def load_grid(filepath: str) -> list[str]:
@@ -52,103 +55,146 @@ def find_edge_starts(grid: list[str]) -> list[tuple[int, int]]:
     return starts
 
 
+def flatten_grid(grid: list[str]) -> tuple[np.ndarray, int]:
+    """
+    Pad the grid with a border of '#' and flatten it into a 1-D byte array,
+    so the 4 neighbours of cell i are always at i - width, i - 1, i + 1, i + width.
+    """
+    width = len(grid[0]) + 2
+    padded = ["#" * width] + [f"#{row}#" for row in grid] + ["#" * width]
+    return np.frombuffer("".join(padded).encode(), dtype=np.uint8), width
+
+
+def bfs_layers(walkable: np.ndarray, width: int, sources: np.ndarray) -> Iterator[np.ndarray]:
+    """
+    Array-based BFS over a padded flat grid.
+
+    Yields the cell indices of each layer, starting with the sources. Cells
+    are marked as visited on discovery, so each one is enqueued once.
+    """
+    offsets = np.array([-width, -1, 1, width])
+    visited = np.zeros(len(walkable), dtype=bool)
+    frontier = np.unique(sources)
+    visited[frontier] = True
+    while len(frontier):
+        yield frontier
+        neighbors = (frontier[:, None] + offsets).ravel()
+        neighbors = np.unique(neighbors[walkable[neighbors] & ~visited[neighbors]])
+        visited[neighbors] = True
+        frontier = neighbors
+
+
 def shortest_path_to_all_palms(grid: list[str]) -> int:
     """
     Perform a multi-source BFS starting from all '.' cells on the left/right edges,
     and return the minimum number of steps needed to reach all palms ('P').
 
+    The BFS runs over a padded flat grid and stops at the layer
+    that reaches the last palm.
+
     Returns:
         The number of steps required to reach all palms.
     """
-    R, C = len(grid), len(grid[0])
+    cells, width = flatten_grid(grid)
+    palms = cells == ord("P")
     palms_remaining = count_palms(grid)
 
-    # Initialize BFS queue with all edge start positions
-    queue = deque([(0, r, c) for (r, c) in find_edge_starts(grid)])
-    visited = set()
-
-    # Directions for 4-way movement
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-    while queue:
-        dist, r, c = queue.popleft()
-        if (r, c) in visited:
-            continue
-        visited.add((r, c))
-
-        # Found a palm — mark it as collected
-        if grid[r][c] == 'P':
-            palms_remaining -= 1
-            if palms_remaining == 0:
-                return dist
-
-        # Explore neighboring cells
-        for dr, dc in directions:
-            rr, cc = r + dr, c + dc
-            if (
-                0 <= rr < R
-                and 0 <= cc < C
-                and grid[rr][cc] != '#'
-            ):
-                queue.append((dist + 1, rr, cc))
+    # Edge start positions, shifted into the padded grid
+    starts = np.array([(r + 1) * width + c + 1 for r, c in find_edge_starts(grid)], dtype=np.int64)
+
+    for dist, layer in enumerate(bfs_layers(cells != ord("#"), width, starts)):
+        palms_remaining -= int(palms[layer].sum())
+        if palms_remaining == 0:
+            return dist
 
     raise RuntimeError("Unable to reach all palms.")
 
 
-def bfs_distances(grid: list[str], start_r: int, start_c: int) -> dict[tuple[int, int], int]:
+def bfs_distances(walkable: np.ndarray, width: int, source: int, out: np.ndarray) -> np.ndarray:
+    """
+    Perform BFS from a starting cell, writing the shortest distance to
+    every reachable cell into the preallocated int32 array `out` (-1 elsewhere).
     """
-    Perform BFS from a starting point (start_r, start_c) to compute
-    the shortest distance to every '.' cell reachable in the grid.
+    out.fill(-1)
+    for dist, layer in enumerate(bfs_layers(walkable, width, np.array([source]))):
+        out[layer] = dist
+    return out
 
-    Returns:
-        A dictionary mapping (r, c) positions of '.' cells to their distance.
+
+def accumulate_palms(totals: np.ndarray, reached: np.ndarray, walkable: np.ndarray,
+                     width: int, palms: list[int]) -> None:
     """
-    R, C = len(grid), len(grid[0])
-    distances = {}
-    seen = set()
-    queue = deque([(0, start_r, start_c)])
+    BFS from each palm in turn, adding its distance plane into `totals`
+    and counting in `reached` which cells it reached.
+    """
+    dist = np.empty(len(walkable), dtype=np.int32)
+    for palm in palms:
+        bfs_distances(walkable, width, palm, dist)
+        np.add(totals, dist, out=totals, where=dist >= 0)
+        reached += dist >= 0
+
+
+# Name of the shared accumulator block and the grid, set in each pool worker
+_shared_name = ""
+_walkable: np.ndarray | None = None
+_width = 0
 
-    while queue:
-        dist, r, c = queue.popleft()
-        if (r, c) in seen:
-            continue
-        seen.add((r, c))
 
-        if grid[r][c] == '.':
-            distances[(r, c)] = dist
+def init_worker(name: str, walkable: np.ndarray, width: int) -> None:
+    """Pool initializer: remember the shared accumulator block and keep the grid."""
+    global _shared_name, _walkable, _width
+    _shared_name, _walkable, _width = name, walkable, width
 
-        # Explore 4-directional neighbors
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            rr, cc = r + dr, c + dc
-            if 0 <= rr < R and 0 <= cc < C and grid[rr][cc] != '#':
-                queue.append((dist + 1, rr, cc))
 
-    return distances
+def accumulate_palms_shared(slot: int, palms: list[int]) -> None:
+    """Accumulate `palms` into this worker's slot of the shared totals."""
+    shared = shared_memory.SharedMemory(name=_shared_name)
+    try:
+        num_cells = len(_walkable)
+        totals, reached = np.ndarray((2, num_cells), dtype=np.int64, buffer=shared.buf,
+                                     offset=slot * 2 * num_cells * np.dtype(np.int64).itemsize)
+        accumulate_palms(totals, reached, _walkable, _width, palms)
+        del totals, reached
+    finally:
+        shared.close()
 
 
-def find_optimal_dot(grid: list[str]) -> int:
+def find_optimal_dot(grid: list[str], workers: int = 1) -> int:
     """
     Find the '.' cell that minimizes the sum of distances
     from all palm ('P') positions.
 
+    Each palm's BFS writes into one int32 distance plane that is added to a
+    running total, so only one plane per worker is alive at a time. With
+    `workers` > 1 the palms are split across a process pool, each worker
+    accumulating into its own slot of a shared-memory block.
+
     Returns:
         The minimal total distance (integer).
     """
-    R, C = len(grid), len(grid[0])
-
-    # Collect all '.' and 'P' positions
-    open_cells = [(r, c) for r in range(R) for c in range(C) if grid[r][c] == '.']
-    palms = [(r, c) for r in range(R) for c in range(C) if grid[r][c] == 'P']
-
-    # Precompute distance maps from every palm to reachable '.' cells
-    palm_distances = [bfs_distances(grid, r, c) for (r, c) in palms]
-
-    best_total = inf
-    for r, c in open_cells:
-        total_distance = sum(dist_map.get((r, c), inf) for dist_map in palm_distances)
-        best_total = min(best_total, total_distance)
-
-    return best_total
+    cells, width = flatten_grid(grid)
+    walkable = cells != ord("#")
+    palms = np.flatnonzero(cells == ord("P")).tolist()
+
+    if workers > 1:
+        shared = shared_memory.SharedMemory(create=True, size=workers * 2 * len(cells) * np.dtype(np.int64).itemsize)
+        try:
+            slots = np.ndarray((workers, 2, len(cells)), dtype=np.int64, buffer=shared.buf)
+            slots.fill(0)
+            with ProcessPoolExecutor(workers, initializer=init_worker,
+                                     initargs=(shared.name, walkable, width)) as pool:
+                list(pool.map(accumulate_palms_shared, range(workers), [palms[i::workers] for i in range(workers)]))
+            totals, reached = slots.sum(axis=0)
+            del slots
+        finally:
+            shared.close()
+            shared.unlink()
+    else:
+        totals, reached = np.zeros((2, len(cells)), dtype=np.int64)
+        accumulate_palms(totals, reached, walkable, width, palms)
+
+    candidates = (cells == ord(".")) & (reached == len(palms))
+    return int(totals[candidates].min()) if candidates.any() else inf
 
 
 def part1(filepath: str = "../input/everybody_codes_e2024_q18_p1.txt"):
@@ -163,9 +209,9 @@ def part2(filepath: str = "../input/everybody_codes_e2024_q18_p2.txt"):
     print("Part 2:", result)
 
 
-def part3(filepath: str = "../input/everybody_codes_e2024_q18_p3.txt"):
+def part3(filepath: str = "../input/everybody_codes_e2024_q18_p3.txt", workers: int = 1):
     grid = load_grid(filepath)
-    result = find_optimal_dot(grid)
+    result = find_optimal_dot(grid, workers)
     print("Part 3:", result)
 
 
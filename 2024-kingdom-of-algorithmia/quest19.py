@@ -5,6 +5,7 @@ https://everybody.codes/event/2024/quests/19
 """
 from itertools import cycle
 from pathlib import Path
+import numpy as np
 
 
 def load_input(part_num: int) -> tuple[str, list[str]]:
@@ -52,65 +53,68 @@ def rotate(grid: list[list], position: tuple[int, int], direction: str) -> None:
         grid[i][j] = val
 
 
-def build_position_mapping(pattern: str, grid_size: tuple[int, int]) -> dict[tuple[int, int], tuple[int, int]]:
+def build_position_mapping(pattern: str, grid_size: tuple[int, int]) -> np.ndarray:
     """
     Apply the full rotation pattern to construct a mapping of positions after one full pattern cycle.
     Returns:
-        A dict mapping each cell (i, j) → its destination (oi, oj).
+        A flat int32 permutation: entry i * cols + j is the flat index of the
+        cell whose value lands on (i, j) after one round.
     """
     rows, cols = grid_size
 
-    # Prepare a coordinate grid tracking where each cell "moves"
-    loc_grid = [[(i, j) for j in range(cols)] for i in range(rows)]
+    # Prepare a grid of flat indexes tracking where each cell "moves"
+    loc_grid = [[i * cols + j for j in range(cols)] for i in range(rows)]
     rotation_points = [(i, j) for i in range(1, rows - 1) for j in range(1, cols - 1)]
 
     # Apply the pattern cyclically across all rotation points
     for direction, point in zip(cycle(pattern), rotation_points):
         rotate(loc_grid, point, direction)
 
-    # Construct mapping after one complete application
-    return {(i, j): loc_grid[i][j] for i in range(rows) for j in range(cols)}
+    return np.array(loc_grid, dtype=np.int32).ravel()
 
 
-def build_exponent_mappings(base_mapping: dict, target: int) -> list[int]:
-    """
-    Precompute repeated mappings using exponentiation by squaring.
-    Returns:
-        A list of mapping sizes needed to reach the target.
-    """
-    mappings = {1: base_mapping}
-    mapping_size = 1
+def permutation_cycles(permutation: np.ndarray) -> list[np.ndarray]:
+    """Split a permutation into its disjoint cycles, each listed in the order p maps them."""
+    seen = np.zeros(len(permutation), dtype=bool)
+    cycles = []
+    for start in range(len(permutation)):
+        if seen[start]:
+            continue
+        members = [start]
+        seen[start] = True
+        nxt = int(permutation[start])
+        while nxt != start:
+            members.append(nxt)
+            seen[nxt] = True
+            nxt = int(permutation[nxt])
+        cycles.append(np.array(members, dtype=np.int32))
+    return cycles
 
-    while mapping_size < target:
-        prev = mappings[mapping_size]
-        mapping_size *= 2
-        # Compose mapping with itself
-        mappings[mapping_size] = {k: prev[v] for k, v in prev.items()}
 
-    # Determine which precomputed powers are needed for target
-    required = [k for k in mappings if k & target]
-    return required, mappings
+def permutation_power(permutation: np.ndarray, rounds: int) -> np.ndarray:
+    """
+    Compose a permutation with itself `rounds` times in O(cells).
+
+    Within a cycle of length L every step moves one place along the cycle,
+    so `rounds` steps move rounds % L places.
+    """
+    result = np.empty_like(permutation)
+    for members in permutation_cycles(permutation):
+        result[members] = np.roll(members, -(rounds % len(members)))
+    return result
 
 
 def solve_part(part: int, target: int) -> str:
     """Compute the solution for a given part."""
     pattern, lines = load_input(part)
-    grid = [list(line) for line in lines]
-
-    # Build mapping after one full pattern rotation
-    base_mapping = build_position_mapping(pattern, (len(grid), len(grid[0])))
+    rows, cols = len(lines), len(lines[0])
+    cells = np.array(list("".join(lines)))
 
-    # Precompute mapping powers and required exponents
-    required_sizes, all_mappings = build_exponent_mappings(base_mapping, target)
+    # Build mapping after one full pattern rotation and raise it to the target
+    mapping = permutation_power(build_position_mapping(pattern, (rows, cols)), target)
 
     # Apply composed mapping to produce the final grid
-    new_grid = [row.copy() for row in grid]
-    for i, row in enumerate(grid):
-        for j, _ in enumerate(row):
-            oi, oj = i, j
-            for size in required_sizes:
-                oi, oj = all_mappings[size][(oi, oj)]
-            new_grid[i][j] = grid[oi][oj]
+    new_grid = cells[mapping].reshape(rows, cols)
 
     # Format solution output
     result = flatten(new_grid)
@@ -3,74 +3,90 @@ The Kingdom of Algorithmia [2024]
 Quest 20: Gliding Finale
 https://everybody.codes/event/2024/quests/20
 """
-from collections import defaultdict, deque
+from collections import deque
 from math import inf
 from pathlib import Path
+import numpy as np
+
+
+# Directions N, E, S, W as (row, col) steps
+DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+UNREACHED = np.iinfo(np.int64).min // 4
+
+
+def load_glide_map(grid: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pad the map with walls and return its walkable mask and per-cell altitude change:
+      '+'  → +1 altitude
+      '-'  → -2 altitude
+      other → -1 altitude
+    """
+    padded = np.array([list("#" * (len(grid[0]) + 2))] +
+                      [list(f"#{row}#") for row in grid] +
+                      [list("#" * (len(grid[0]) + 2))])
+    walkable = padded != "#"
+    gain = np.select([padded == "+", padded == "-"], [1, -2], -1)
+    return walkable, gain
+
+
+def glide_step(best: np.ndarray, walkable: np.ndarray, gain: np.ndarray) -> np.ndarray:
+    """
+    Advance a layer of best altitudes indexed [..., facing, r, c] by one move.
+
+    A glider arriving facing d came from the neighbouring cell behind it,
+    facing anything but the opposite of d, so each new plane is the maximum
+    of three shifted planes plus the altitude change of the cell entered.
+    """
+    new = np.full_like(best, UNREACHED)
+    for facing, (dr, dc) in enumerate(DIRECTIONS):
+        came_from = np.delete(best, (facing + 2) % 4, axis=-3).max(axis=-3)
+        # The padding walls never hold altitudes, so rolling cannot wrap any in
+        arrived = np.roll(came_from, (dr, dc), axis=(-2, -1))
+        new[..., facing, :, :] = np.where(walkable & (arrived > UNREACHED), arrived + gain, UNREACHED)
+    return new
 
 
 def part1(filepath: str = "../input/everybody_codes_e2024_q20_p1.txt"):
     """
-    Explore all possible paths up to 100 moves.
+    Find the highest altitude after exactly 100 moves.
+
+    A higher altitude always dominates a lower one in the same cell and
+    facing, so each step only keeps the maximum altitude per (facing, r, c),
+    updated from the previous step by shifted maxima.
     """
-    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-    delta = {'+': +1, '-': -2}
     max_steps, start_altitude = 100, 1000
 
     grid = Path(filepath).read_text().strip().splitlines()
-    R, C = len(grid), len(grid[0])
+    walkable, gain = load_glide_map(grid)
 
-    start = None
-    for r, cols in enumerate(grid):
-        for c, cell in enumerate(cols):
-            if cell == 'S':
-                start = (r, c)
-                break
+    start_r, start_c = next((r, row.index("S")) for r, row in enumerate(grid) if "S" in row)
+    best = np.full((4, *walkable.shape), UNREACHED, dtype=np.int64)
+    # Start facing each possible direction
+    best[:, start_r + 1, start_c + 1] = start_altitude
 
-    # Each state: (step, row, col, altitude, direction)
-    queue = deque()
-    for d in range(4):  # Start facing each possible direction
-        queue.append((0, start[0], start[1], start_altitude, d))
+    for _ in range(max_steps):
+        best = glide_step(best, walkable, gain)
 
-    seen = set()
-    best_altitude = -inf
+    best_altitude = best.max()
+    print("Part 1:", int(best_altitude) if best_altitude > UNREACHED else -inf)
 
+
+def grid_distances(walkable: np.ndarray, target: tuple[int, int]) -> np.ndarray:
+    """BFS step distances from every cell to `target`, ignoring facing (inf if unreachable)."""
+    dist = np.full(walkable.shape, inf)
+    dist[target] = 0
+    queue = deque([target])
     while queue:
-        steps, r, c, altitude, facing = queue.popleft()
-
-        # Stop when we’ve taken exactly max_steps moves
-        if steps == max_steps:
-            best_altitude = max(best_altitude, altitude)
-            continue
-
-        # Avoid revisiting the same state
-        state = (r, c, altitude, facing)
-        if state in seen:
-            continue
-        seen.add(state)
-
-        # Try turning or going straight
-        for turn in [3, 0, 1]:  # left, straight, right relative turns
-            new_dir = (facing + turn) % 4
-            dr, dc = directions[new_dir]
+        r, c = queue.popleft()
+        for dr, dc in DIRECTIONS:
             nr, nc = r + dr, c + dc
-
-            # Stay within bounds and avoid walls
-            if not (0 <= nr < R and 0 <= nc < C):
-                continue
-            cell = grid[nr][nc]
-            if cell == "#":
-                continue
-
-            # Update altitude based on cell type
-            new_altitude = altitude + delta.get(cell, -1)
-
-            # Add next state
-            queue.append((steps + 1, nr, nc, new_altitude, new_dir))
-
-    print("Part 1:", best_altitude)
+            if walkable[nr, nc] and dist[nr, nc] == inf:
+                dist[nr, nc] = dist[r, c] + 1
+                queue.append((nr, nc))
+    return dist
 
 
-def part2(filepath: str = "../input/everybody_codes_e2024_q20_p2.txt"):
+def part2(filepath: str = "../input/everybody_codes_e2024_q20_p2.txt", max_steps: int | None = None):
     """
     The grid contains checkpoints A → B → C → S that must be visited in order.
     Movement depends on direction (N, E, S, W), and each cell modifies altitude:
@@ -80,118 +96,124 @@ def part2(filepath: str = "../input/everybody_codes_e2024_q20_p2.txt"):
 
     The goal is to return to 'S' (after visiting A, B, and C) with altitude ≥ 10,000,
     minimizing the number of steps.
-    """
 
-    # Parse input
+    The best altitude of every state is held in an array indexed
+    [checkpoint, direction, r, c] and expanded one BFS layer at a time.
+    A state needs at least as many steps as its distance through the
+    remaining checkpoints, and as its altitude deficit below 10,000 (altitude
+    rises by at most 1 per step); states that cannot finish within
+    `max_steps` (if given) or at all are pruned.
+    """
     grid = Path(filepath).read_text().strip().splitlines()
-    nrows, ncols = len(grid), len(grid[0])
-
-    # Identify checkpoints
-    next_target: dict[str | None, tuple[tuple[int, int], str]] = {}
-    for r, columns in enumerate(grid):
-        for c, cell in enumerate(columns):
-            match cell:
-                case 'A':
-                    next_target[None] = ((r, c), 'A')
-                case 'B':
-                    next_target['A'] = ((r, c), 'B')
-                case 'C':
-                    next_target['B'] = ((r, c), 'C')
-                case 'S':
-                    start = (r, c)
-                    next_target['C'] = ((r, c), 'S')
-                case _:  # ignore all other characters
-                    pass
-
-    # Configuration constants
-    DELTA = {'+': +1, '-': -2}  # Altitude adjustments
-    VALID_TURNS = {             # Allowed direction changes
-        'N': "NEW",             # from N: turn N, E, or W
-        'E': "NES",             # from E: turn N, E, or S
-        'S': "ESW",             # from S: turn E, S, or W
-        'W': "NSW",             # from W: turn N, S, or W
-    }
+    walkable, gain = load_glide_map(grid)
+
+    # Checkpoints in visiting order, in padded coordinates
+    position = {cell: (r + 1, c + 1) for r, row in enumerate(grid) for c, cell in enumerate(row)}
+    targets = [position["A"], position["B"], position["C"], position["S"]]
 
     START_ALT = 10_000
     ALT_RANGE = 100             # max altitude deviation allowed
 
-    # BFS queue initialization
-    # state: (altitude, row, col, last_checkpoint, direction)
-    q = deque([(START_ALT, start[0], start[1], None, 'S')])
-    seen = defaultdict(int)
-    seen[(start[0], start[1], None, 'S')] = START_ALT
+    # Fewest steps from each cell through the checkpoints still to visit
+    to_finish = np.zeros((len(targets), *walkable.shape))
+    remaining = 0.0
+    for checkpoint in reversed(range(len(targets))):
+        to_finish[checkpoint] = grid_distances(walkable, targets[checkpoint]) + remaining
+        if checkpoint:
+            remaining = to_finish[checkpoint][targets[checkpoint - 1]]
+    to_finish = to_finish[:, None]
+
+    best = np.full((len(targets), 4, *walkable.shape), UNREACHED, dtype=np.int64)
+    best[(0, 2, *targets[-1])] = START_ALT   # start at S facing south
+    # Best altitude ever held by each state, to skip dominated revisits
+    seen = best.copy()
 
-    # BFS traversal
     steps = 0
     result = 0
-
-    while q and not result:
-        for _ in range(len(q)):  # process one BFS layer
-            altitude, r, c, last_cp, direction = q.popleft()
-
-            for new_dir in VALID_TURNS[direction]:
-                r2 = r + (new_dir == 'S') - (new_dir == 'N')
-                c2 = c + (new_dir == 'E') - (new_dir == 'W')
-
-                # Check bounds and obstacles
-                if not (0 <= r2 < nrows and 0 <= c2 < ncols):
-                    continue
-                if grid[r2][c2] == '#':
-                    continue
-
-                # Compute new altitude
-                new_altitude = altitude + DELTA.get(grid[r2][c2], -1)
-                if not (START_ALT - ALT_RANGE <= new_altitude <= START_ALT + ALT_RANGE):
-                    continue
-
-                # Check for checkpoint progression
-                next_cp = last_cp
-                if (r2, c2) == next_target[last_cp][0]:
-                    next_cp = next_target[last_cp][1]
-
-                    # If we returned to 'S' with enough altitude → success
-                    if next_cp == 'S' and new_altitude >= START_ALT:
-                        result = steps + 1
-                        break
-
-                # Skip if we've seen this state with a higher or equal altitude
-                state = (r2, c2, next_cp, new_dir)
-                if seen[state] >= new_altitude:
-                    continue
-
-                seen[state] = new_altitude
-                q.append((new_altitude, r2, c2, next_cp, new_dir))
-
-            if result:
-                break
+    while (best > UNREACHED).any():
         steps += 1
+        best = glide_step(best, walkable, gain)
+        best[(best < START_ALT - ALT_RANGE) | (best > START_ALT + ALT_RANGE)] = UNREACHED
+
+        # Entering the next checkpoint moves the state on to the following one
+        finished = best[(-1, slice(None), *targets[-1])]
+        if (finished >= START_ALT).any():
+            result = steps
+            break
+        for checkpoint in reversed(range(len(targets) - 1)):
+            r, c = targets[checkpoint]
+            best[checkpoint + 1, :, r, c] = np.maximum(best[checkpoint + 1, :, r, c], best[checkpoint, :, r, c])
+            best[checkpoint, :, r, c] = UNREACHED
+        best[(-1, slice(None), *targets[-1])] = UNREACHED
+
+        # Skip states already held with a higher or equal altitude
+        best[best <= seen] = UNREACHED
+        lower_bound = np.maximum(to_finish, START_ALT - best)
+        best[lower_bound == inf] = UNREACHED
+        if max_steps is not None:
+            best[steps + lower_bound > max_steps] = UNREACHED
+        np.maximum(seen, best, out=seen)
 
     print("Part 2:", result)
 
 
-def part3():
+def descent_steps(altitude: int, column_gain: np.ndarray, first_row: int) -> float:
+    """
+    Count the steps straight south, starting below `first_row` of a repeating
+    column, until the altitude drops to 0 or below.
+
+    After m full periods plus k more rows the altitude is
+    altitude + m * net + prefix[k], so for each k the smallest m comes in
+    closed form and the answer is the best m * period + k.
+    """
+    period = len(column_gain)
+    prefix = np.cumsum(np.roll(column_gain, -(first_row + 1)))
+    net = int(prefix[-1])
+    k = np.arange(1, period + 1)
+    if net >= 0:
+        hits = k[altitude + prefix <= 0]
+        return int(hits[0]) if len(hits) else inf
+    periods = np.maximum(0, -((altitude + prefix) // net))
+    return int((periods * period + k).min())
+
+
+def part3(filepath: str = "../input/everybody_codes_e2024_q20_p3.txt", altitude: int = 384_400):
     """
-    Check the input file to determine the location of the best column.
+    Find how far south the glider can get on the endlessly repeating map.
+
+    The glider heads down the start column for r rows, slides east or west
+    along row r into a wall-free column, and then flies straight south on
+    it. Every (row, column) choice within one tile period is tried, and
+    each descent is solved in closed form from the column's net altitude
+    change per period, so the cost does not depend on the altitude.
     """
-    distance_south = 0
-    altitude = 384_400
-    # Best column is 5 segments to the West of start position
-    altitude -= 5
-    # Pattern in column repeats "+..."
-    while altitude > 0:
-        distance_south += 1
-        if (distance_south + 3) % 4 == 0:
-            altitude += 1
-        else:
-            altitude -= 1
-
-    print("Part 3:", distance_south)
-
-    # Simpler solution:
-    altitude_start = 384_400 - 5
-    # Each 4-step cycle decreases altitude by 2.
-    distance_south = (((altitude_start + 1) // 2) * 4) - 1
-    print("Part 3 with equation:", distance_south)
+    grid = Path(filepath).read_text().strip().splitlines()
+    walkable, gain = load_glide_map(grid)
+    walkable, gain = walkable[1:-1, 1:-1], gain[1:-1, 1:-1]
+    height, width = walkable.shape
+    start = grid[0].index("S")
+
+    open_columns = walkable.all(axis=0)
+    best_distance = 0
+    altitude_down = altitude
+    for row in range(height):
+        if row:
+            # Fly one more row down the start column before sliding sideways
+            if not walkable[row, start]:
+                break
+            altitude_down += gain[row, start]
+        for step in (-1, 1):
+            slide_altitude = altitude_down
+            column = start
+            while 0 <= column < width and walkable[row, column]:
+                if open_columns[column]:
+                    distance = row + descent_steps(slide_altitude, gain[:, column], row)
+                    best_distance = max(best_distance, distance)
+                column += step
+                if 0 <= column < width:
+                    slide_altitude += gain[row, column]
+
+    print("Part 3:", best_distance)
 
 
 if __name__ == "__main__":
@@ -5,7 +5,12 @@ https://everybody.codes/event/2025/quests/2
 """
 from pathlib import Path
 import re
-from numba import njit, prange
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # fall back to the vectorised NumPy kernel
+    njit = prange = None
 
 
 def load_data(filepath: str) -> complex:
@@ -34,49 +39,88 @@ def part1(filepath: str = "../input/everybody_codes_e2025_q02_p1.txt") -> None:
     print(f"Part 1: [{zx},{zy}]")
 
 
-@njit
-def engrave_point(point: tuple[int, int]) -> bool:
-    """Determine if `point` is to be engraved by performing 100 cycles of the steps."""
-    px, py = point
-    zx, zy = 0, 0
-    for _ in range(100):
+def escape_times_numpy(left_x: int, top_y: int, step: int, cycles: np.ndarray) -> int:
+    """
+    Vectorised NumPy version of `escape_times`, used when numba is unavailable.
+
+    Every point of the lattice runs the 100 cycles together; points that
+    leave the bounds record their cycle and are dropped from the working arrays.
+    """
+    height, width = cycles.shape
+    flat = cycles.reshape(-1)
+    ys, xs = np.divmod(np.arange(height * width), width)
+    px = left_x + xs * step
+    py = top_y + ys * step
+    alive = np.arange(height * width)
+    zx = np.zeros(len(alive), dtype=np.int64)
+    zy = np.zeros(len(alive), dtype=np.int64)
+    for cycle in range(100):
         x2 = zx * zx - zy * zy
         y2 = 2 * zx * zy
-        zx = int(x2 / 100_000) + px
-        zy = int(y2 / 100_000) + py
-        # check bounds
-        if -1_000_000 <= zx <= 1_000_000 and -1_000_000 <= zy <= 1_000_000:
-            continue
-        return False
-    return True
+        # Truncate toward zero, as int(x / 100_000) does
+        zx = np.trunc(x2 / 100_000).astype(np.int64) + px[alive]
+        zy = np.trunc(y2 / 100_000).astype(np.int64) + py[alive]
+        inside = (np.abs(zx) <= 1_000_000) & (np.abs(zy) <= 1_000_000)
+        flat[alive[~inside]] = cycle
+        alive, zx, zy = alive[inside], zx[inside], zy[inside]
+
+    flat[alive] = 100
+    return len(alive)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def escape_times(left_x: int, top_y: int, step: int, cycles: np.ndarray) -> int:
+        """
+        Run the 100 cycles of the steps for every point of a lattice, in parallel.
+
+        cycles[i, j] is set to the number of cycles point
+        (left_x + j * step, top_y + i * step) completes within bounds, 100
+        meaning it is engraved, and the number of engraved points is returned.
+        """
+        height, width = cycles.shape
+        engraved = 0
+        for i in prange(height):
+            py = top_y + i * step
+            for j in range(width):
+                px = left_x + j * step
+                zx, zy = 0, 0
+                cycle = 0
+                while cycle < 100:
+                    x2 = zx * zx - zy * zy
+                    y2 = 2 * zx * zy
+                    zx = int(x2 / 100_000) + px
+                    zy = int(y2 / 100_000) + py
+                    if not (-1_000_000 <= zx <= 1_000_000 and -1_000_000 <= zy <= 1_000_000):
+                        break
+                    cycle += 1
+                cycles[i, j] = cycle
+                if cycle == 100:
+                    engraved += 1
+        return engraved
+else:
+    escape_times = escape_times_numpy
+
+
+def count_engraved(left_x: int, top_y: int, size: int = 1000, step: int = 1) -> int:
+    """Count the engraved points of the size x size region, sampled every `step` units."""
+    points = size // step + 1
+    cycles = np.empty((points, points), dtype=np.uint8)
+    return int(escape_times(left_x, top_y, step, cycles))
 
 
 def part2(filepath: str = "../input/everybody_codes_e2025_q02_p2.txt") -> None:
     """How many points will be engraved according to the blacksmith’s plan?"""
-    top_left = load_data(filepath)
-    left_x, top_y = top_left
-    right_x, bottom_y = left_x + 1000, top_y + 1000
-    engraved_total = 0
-
-    for y in range(top_y, bottom_y+1, 10):
-        for x in range(left_x, right_x+1, 10):
-            if engrave_point((x, y)):
-                engraved_total += 1
+    left_x, top_y = load_data(filepath)
+    engraved_total = count_engraved(left_x, top_y, step=10)
 
     print("Part 2:", engraved_total)
 
 
 def part3(filepath: str = "../input/everybody_codes_e2025_q02_p3.txt") -> None:
     """What is the number of points you plan to engrave?"""
-    top_left = load_data(filepath)
-    left_x, top_y = top_left
-    right_x, bottom_y = left_x + 1000, top_y + 1000
-
-    engraved_total = 0
-    for y in prange(top_y, bottom_y + 1):
-        for x in range(left_x, right_x + 1):
-            if engrave_point((x, y)):
-                engraved_total += 1
+    left_x, top_y = load_data(filepath)
+    engraved_total = count_engraved(left_x, top_y)
 
     print("Part 3:", engraved_total)
 
@@ -3,8 +3,12 @@ The Song of Ducks and Dragons [2025]
 Quest 5: Fishbone Order
 https://everybody.codes/event/2025/quests/5
 """
+from math import inf
 from pathlib import Path
-from typing import Iterator, List, Tuple
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import pickle
+import tempfile
 
 
 def read_line(filepath: str) -> Iterator[Tuple[int, List[int]]]:
@@ -16,39 +20,141 @@ def read_line(filepath: str) -> Iterator[Tuple[int, List[int]]]:
             yield (int(sword_id), numbers)
 
 
-def build_fishbone(numbers: List[int]) -> List[dict]:
-    """Build a fishbone structure represented as a list of dict segments."""
-    spine = [{"value": numbers[0], "left": None, "right": None}]
-    for number in numbers[1:]:
-        for segment in spine:
-            if ((number < segment["value"] and segment["left"] is None) or
-                (number > segment["value"] and segment["right"] is None)):
-                segment["left" if number < segment["value"] else "right"] = number
-                break
+class Spine:
+    """A fishbone kept as parallel lists of segment values and their left/right numbers."""
+    __slots__ = ("values", "lefts", "rights")
+
+    def __init__(self) -> None:
+        self.values: List[int] = []
+        self.lefts: List[Optional[int]] = []
+        self.rights: List[Optional[int]] = []
+
+
+def _refresh(tree: list, node: int, combine) -> None:
+    """Recompute the ancestors of leaf `node` in a segment tree."""
+    node //= 2
+    while node:
+        tree[node] = combine(tree[2 * node], tree[2 * node + 1])
+        node //= 2
+
+
+def build_fishbone(numbers: List[int]) -> Spine:
+    """
+    Build a fishbone structure, placing each number in the first segment
+    with a free slot on the right side of it.
+
+    Two segment trees over spine positions index the free slots: one holds
+    the largest value among segments with an open left slot, the other the
+    smallest value among segments with an open right slot. The first
+    segment that takes a number v is then found by descending towards the
+    leftmost leaf with open_left > v or open_right < v, so each insert
+    costs O(log n) instead of a scan of the spine.
+    """
+    size = 1
+    while size < len(numbers):
+        size *= 2
+    open_left = [-inf] * (2 * size)
+    open_right = [inf] * (2 * size)
+
+    spine = Spine()
+    for number in numbers:
+        node = 1
+        if open_left[node] > number or open_right[node] < number:
+            while node < size:
+                node *= 2
+                if not (open_left[node] > number or open_right[node] < number):
+                    node += 1
+            position = node - size
+            if open_left[node] > number:
+                spine.lefts[position] = number
+                open_left[node] = -inf
+                _refresh(open_left, node, max)
+            else:
+                spine.rights[position] = number
+                open_right[node] = inf
+                _refresh(open_right, node, min)
         else:
-            spine.append({"value": number, "left": None, "right": None})
+            node = size + len(spine.values)
+            spine.values.append(number)
+            spine.lefts.append(None)
+            spine.rights.append(None)
+            open_left[node] = open_right[node] = number
+            _refresh(open_left, node, max)
+            _refresh(open_right, node, min)
     return spine
 
 
-def get_quality(spine: List[dict]) -> int:
+def get_quality(spine: Spine) -> int:
     """Return integer made by concatenating segment values."""
-    return int("".join(str(segment["value"]) for segment in spine))
+    return int("".join(map(str, spine.values)))
 
 
-def get_levels(spine: List[dict]) -> List[int]:
+def get_levels(spine: Spine) -> List[int]:
     """Return a list of concatenated left/mid/right numbers per segment."""
     return [
-        int("".join(
-            str(x) for x in (filter(None, [segment["left"], segment["value"], segment["right"]]))
-        ))
-        for segment in spine
+        int("".join(str(x) for x in filter(None, segment)))
+        for segment in zip(spine.lefts, spine.values, spine.rights)
     ]
 
 
-def sword_sort_key(sword: Tuple[int, int, List[int]]) -> Tuple[int, Tuple[int, ...], int]:
-    """Sort by quality, levels, and id (all descending)."""
-    sword_id, quality, levels = sword
-    return (quality, tuple(levels), sword_id)
+def sword_keys(filepath: str) -> Iterator[Tuple[int, Tuple[int, ...], int]]:
+    """
+    Yield one sort key per sword, streaming over the file.
+
+    Swords sort by quality, then levels, then id, so each key is
+    (quality, levels, id) and is built once from the spine.
+    """
+    for sword_id, numbers in read_line(filepath):
+        spine = build_fishbone(numbers)
+        yield (get_quality(spine), tuple(get_levels(spine)), sword_id)
+
+
+def _spill(run: list) -> IO[bytes]:
+    """Write a sorted run to a temporary file in pickled batches."""
+    spill = tempfile.TemporaryFile()
+    for start in range(0, len(run), 10_000):
+        pickle.dump(run[start:start + 10_000], spill)
+    spill.seek(0)
+    return spill
+
+
+def _unspill(spill: IO[bytes]) -> Iterator:
+    """Read back a run written by `_spill`."""
+    with spill:
+        while True:
+            try:
+                yield from pickle.load(spill)
+            except EOFError:
+                return
+
+
+def rank_swords(keys: Iterable, k: Optional[int] = None, best: bool = True,
+                run_size: int = 1_000_000) -> Iterator:
+    """
+    Rank sword keys from the best (or, with best=False, the weakest).
+
+    With `k`, only the first k are kept, in a bounded heap. Without it,
+    every key is ranked with an external merge sort. Runs of `run_size`
+    keys are sorted in memory and spilled to temporary files, then merged
+    lazily, so memory stays bounded however long the list is.
+    """
+    if k is not None:
+        yield from (heapq.nlargest if best else heapq.nsmallest)(k, keys)
+        return
+
+    spills, run = [], []
+    for key in keys:
+        run.append(key)
+        if len(run) == run_size:
+            run.sort(reverse=best)
+            spills.append(_spill(run))
+            run = []
+    run.sort(reverse=best)
+    if not spills:
+        yield from run
+        return
+    spills.append(_spill(run))
+    yield from heapq.merge(*map(_unspill, spills), reverse=best)
 
 
 def part1(filepath: str):
@@ -62,8 +168,13 @@ def part2(filepath: str):
     What is the quality difference between the best and
     the weakest sword on the given list?
     """
-    qualities = [get_quality(build_fishbone(numbers)) for _, numbers in read_line(filepath)]
-    print("Part 2:", max(qualities) - min(qualities))
+    best = weakest = None
+    for _, numbers in read_line(filepath):
+        quality = get_quality(build_fishbone(numbers))
+        if best is None:
+            best = weakest = quality
+        best, weakest = max(best, quality), min(weakest, quality)
+    print("Part 2:", best - weakest)
 
 
 def part3(filepath: str):
@@ -71,12 +182,8 @@ def part3(filepath: str):
     Sort the swords from the best to the weakest.
     What is the checksum of the sorted list?
     """
-    swords = [
-        (sword_id, get_quality(spine := build_fishbone(numbers)), get_levels(spine))
-        for sword_id, numbers in read_line(filepath)
-    ]
-    swords.sort(key=sword_sort_key, reverse=True)
-    checksum = sum(sword_id * (index + 1) for index, (sword_id, _, _) in enumerate(swords))
+    ranked = rank_swords(sword_keys(filepath))
+    checksum = sum(sword_id * rank for rank, (_, _, sword_id) in enumerate(ranked, start=1))
     print("Part 3:", checksum)
 
 
@@ -4,6 +4,7 @@ Quest 6: Mentorship Matrix
 https://everybody.codes/event/2025/quests/6
 """
 from pathlib import Path
+import numpy as np
 
 def load_data(filepath: str) -> str:
     """Load and return stripped text from a file."""
@@ -41,80 +42,60 @@ def part2(filepath: str = "../input/everybody_codes_e2025_q06_p2.txt"):
     print("Part 2:", total)
 
 
-def part3(filepath: str = "../input/everybody_codes_e2025_q06_p3.txt",
-          window_size: int = 1000):
+def mentor_pairs(notes: str, window_size: int, repeat: int) -> int:
     """
-    What is the total number of possible novice-mentor pairs?
+    Count the novice-mentor pairs within ±window_size places in `notes`
+    repeated `repeat` times.
+
+    With n = len(notes) and per-letter prefix counts over the notes, the
+    number of mentors of a letter in the first x places of the repeated
+    string is (x // n) * total + prefix[x % n]. A novice at place j of
+    copy k sees the same count in every copy where its window stays inside
+    the string, so those copies are counted once and multiplied out. Only
+    the first and last ceil(window_size / n) + 1 copies have clipped
+    windows; they are counted one copy at a time, vectorised over the
+    notes with NumPy.
     """
-    notes = load_data(filepath)
-    s = notes * 1000
-    length = len(s)
-
-    # Initialize prefix sums for A, B, C
-    prefix = {ch: [0] * (length + 1) for ch in 'ABC'}
-
-    for i, ch in enumerate(s):
-        for key in 'ABC':
-            prefix[key][i + 1] = prefix[key][i] + (1 if ch == key else 0)
+    n = len(notes)
+    length = n * repeat
+    codes = np.frombuffer(notes.encode(), dtype=np.uint8)
 
-    result = {'a': [], 'b': [], 'c': []}
-
-    for i, ch in enumerate(s):
-        if ch in result:
-            upper = ch.upper()
-            start = max(0, i - window_size)
-            end = min(length - 1, i + window_size)
-            count = prefix[upper][end + 1] - prefix[upper][start]
-            result[ch].append(count)
-
-    total = sum(sum(lst) for lst in result.values())
-    print("Part 3:", total)
+    total = 0
+    for novice in np.unique(codes[(codes >= ord("a")) & (codes <= ord("z"))]):
+        places = np.flatnonzero(codes == novice)
+        prefix = np.concatenate(([0], np.cumsum(codes == novice - 32)))
+
+        def mentors_before(x):
+            return (x // n) * prefix[-1] + prefix[x % n]
+
+        # Copies [first, last] hold the novice's whole window
+        first = np.maximum(-((places - window_size) // n), 0)
+        last = np.minimum((length - window_size - 1 - places) // n, repeat - 1)
+        inside = np.maximum(last - first + 1, 0)
+        total += int((inside * (mentors_before(places + window_size + 1)
+                                - mentors_before(places - window_size))).sum())
+
+        clipped_low = min(repeat, int(first.max()))
+        clipped_high = max(clipped_low, int(last.min()) + 1)
+        for copy in (*range(clipped_low), *range(clipped_high, repeat)):
+            edge = (copy < first) | (copy > last)
+            novices = copy * n + places[edge]
+            total += int((mentors_before(np.minimum(novices + window_size + 1, length))
+                          - mentors_before(np.maximum(novices - window_size, 0))).sum())
+    return total
 
 
-def part3_new(filepath: str = "../input/everybody_codes_e2025_q06_p3.txt",
-              window_size: int = 1000,
-              repeat: int = 1000):
+def part3(filepath: str = "../input/everybody_codes_e2025_q06_p3.txt",
+          window_size: int = 1000,
+          repeat: int = 1000):
     """
-    Count uppercase letters within ±N places of each lowercase letter
-    using string padding to handle boundary windows.
+    What is the total number of possible novice-mentor pairs?
     """
-    data = load_data(filepath)
-    total = 0
-
-    # Pad string to safely handle windows that extend beyond start/end
-    loop = data[-window_size:] + data + data[:window_size]
-    start_pad = data + data[:window_size]
-    end_pad = data[-window_size:] + data
-
-    # Main loop over the middle portion of the padded string
-    for idx in range(window_size, len(data) + window_size):
-        if loop[idx].islower():
-            start = max(idx - window_size, 0)
-            end = idx + window_size + 1
-            total += loop[start:end].count(loop[idx].upper())
-
-    # Adjust for repeated strings
-    total *= (repeat - 2)
-
-    # Handle boundary windows at the start
-    for idx in range(len(data)):
-        if start_pad[idx].islower():
-            start = max(idx - window_size, 0)
-            end = idx + window_size + 1
-            total += start_pad[start:end].count(start_pad[idx].upper())
-
-    # Handle boundary windows at the end
-    for idx in range(window_size, len(data) + window_size):
-        if end_pad[idx].islower():
-            start = max(idx - window_size, 0)
-            end = idx + window_size + 1
-            total += end_pad[start:end].count(end_pad[idx].upper())
-
-    print("Part 3:", total)
+    notes = load_data(filepath)
+    print("Part 3:", mentor_pairs(notes, window_size, repeat))
 
 
 if __name__ == "__main__":
     part1()
     part2()
-    #part3()
-    part3_new()
+    part3()
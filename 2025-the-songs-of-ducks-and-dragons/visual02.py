@@ -1,60 +1,46 @@
 """
 Visual generated from Quest 2 Part 3.
 """
-import itertools
 import numpy as np
 from pathlib import Path
 from PIL import Image
 import re
 import tqdm
 
+from quest02 import escape_times
+
 
 def read_data(filepath="../input/everybody_codes_e2025_q02_p3.txt"):
     text = Path(filepath).read_text().strip()
     return list(map(int, re.findall(r"-?\d+", text)))
 
-    
-def add(a, b):
-    x1, y1 = a
-    x2, y2 = b
-    return [x1 + x2, y1 + y2]
-
-
-def multiply(a, b):
-    x1, y1 = a
-    x2, y2 = b
-    return [x1*x2-y1*y2, x1*y2+y1*x2]
-
-
-def divide(a, b):
-    x1, y1 = a
-    x2, y2 = b
-    return [int(x1 / x2), int(y1 / y2)]
 
+def create_image(left_x, top_y, size=1_000, step=1, shade=False, tile_rows=256):
+    """
+    Render the engraving of the size x size region starting at (left_x, top_y).
 
-def create_image(left_x, top_y):
+    One pixel is drawn every `step` units. Rows are computed `tile_rows` at
+    a time with the solver's escape-time kernel and written straight into
+    the image, so large renders only hold one tile of cycle counts. With
+    `shade`, points that escape are tinted by how many cycles they lasted.
+    """
     # Set background and foreground colours
-    background = np.array([0, 0, 0])
-    engraved = np.array([255, 0, 255])
-
-    bitmap = [[background for _ in range(1_001)] 
-              for _ in range(1_001)]
-
-    for x_delta, y_delta in tqdm.tqdm(list(itertools.product(range(1_001), range(1_001)))):
-        A = [left_x + x_delta, top_y + y_delta]
-        result = [0, 0]
-        is_engraved = True
-        for _ in range(100):
-            result = multiply(result, result)
-            result = divide(result, [100_000, 100_000])
-            result = add(result, A)
-            if any(abs(num)>1_000_000 for num in result):
-                is_engraved = False
-                break
-        if is_engraved:
-            bitmap[x_delta][y_delta] = engraved
-
-    image = Image.fromarray(np.array(bitmap).astype(np.uint8), "RGB")
+    background = np.array([0, 0, 0], dtype=np.uint8)
+    engraved = np.array([255, 0, 255], dtype=np.uint8)
+
+    points = size // step + 1
+    pixels = np.empty((points, points, 3), dtype=np.uint8)
+    cycles = np.empty((tile_rows, points), dtype=np.uint8)
+
+    for first in tqdm.tqdm(range(0, points, tile_rows)):
+        tile = cycles[:min(tile_rows, points - first)]
+        escape_times(left_x, top_y + first * step, step, tile)
+        if shade:
+            pixels[first:first + len(tile)] = tile[..., None].astype(np.uint16) * engraved // 100
+        else:
+            pixels[first:first + len(tile)] = np.where(tile[..., None] == 100, engraved, background)
+
+    image = Image.fromarray(pixels, "RGB")
     image.save("e2025_q02_output.png")
 
 